@@ -0,0 +1,54 @@
+"""
+Атомарний запис файлів: дані пишуться в тимчасовий файл поруч із цільовим,
+скидаються на диск і підміняють ціль через os.replace, після чого fsync
+каталогу робить надійною саму підміну. Після збою на диску лишається або
+старий, або новий файл повністю.
+
+Приклад:
+    with atomic_write('data/cache/table.npy') as f:
+        np.save(f, table)
+"""
+
+import os
+from contextlib import contextmanager
+
+
+def fsync_directory(directory: str):
+    """Скидає на диск запис каталогу (створення і перейменування файлів у ньому)"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory or '.', os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(path: str, mode=0o666):
+    """
+    Відкриває тимчасовий файл на запис у двійковому режимі, після успішного
+    виходу з блоку він замінює path. При помилці тимчасовий файл видаляється.
+
+    :param path: Цільовий файл.
+    :param mode: Права нового файлу (з урахуванням umask), 0o600 - лише власнику.
+    """
+    tmp_path = path + '.tmp'
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    fsync_directory(os.path.dirname(path))
+
+
+def write_atomic(path: str, data: bytes, mode=0o666):
+    """Атомарно записує байти у файл"""
+    with atomic_write(path, mode) as f:
+        f.write(data)
@@ -0,0 +1,297 @@
+"""
+Двійковий архів бюлетенів: зашифровані конверти голосів і зараховані голоси.
+
+Файл починається з заголовка b'VBARCH1\\n', далі йдуть записи
+<u8 тип><u8 кількість полів><u32 crc32><u32 довжина поля>...<поля>.
+Читач відображає файл через mmap і повертає поля як memoryview без
+копіювання, тому перегляд і фільтрація архіву йдуть зі швидкістю диска.
+Обірваний або пошкоджений хвіст (збій посеред запису) читач відкидає, а
+письменник обрізає при відкритті, щоб нові записи йшли одразу за останнім
+цілим. Письменник буферизує записи, а фоновий потік скидає їх на диск раз на
+sync_interval секунд, навіть якщо нових записів немає, тож збій втрачає не
+більше трафіку за цей час.
+
+Перерахунок: recount() читає конверти потоком і подає їх пакетами в
+Commission.count_votes_batch.
+
+Приклад:
+    with ArchiveWriter('data/archive/day1.bin') as archive:
+        archive.write_envelope(encrypted_ballot, encrypted_signature, aes_key)
+
+    summary = recount('data/archive/day1.bin', commission)
+"""
+
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+from journal import encode_vote, decode_record
+
+MAGIC = b'VBARCH1\n'
+
+RECORD_ENVELOPE = 1
+RECORD_VOTE = 2
+
+_RECORD_HEADER = struct.Struct('<BBI')
+_FIELD_LENGTH = struct.Struct('<I')
+
+
+def _valid_size(path: str) -> int:
+    """Довжина архіву до кінця останнього цілого запису (0 - файлу немає або заголовок обірвано)"""
+    if not os.path.exists(path) or os.path.getsize(path) < len(MAGIC):
+        return 0
+    with ArchiveReader(path) as reader:
+        for _ in reader.scan():
+            pass
+        return reader.valid_size
+
+
+class ArchiveWriter:
+    def __init__(self, path: str, buffer_size=1 << 20, sync_interval=None):
+        """
+        Відкриває архів на дописування, новий файл отримує заголовок, обірваний
+        хвіст існуючого обрізається.
+
+        :param path: Шлях до файлу архіву.
+        :param buffer_size: Розмір буфера запису в байтах.
+        :param sync_interval: Як часто скидати буфер на диск, секунд (None - лише в flush і close).
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        valid_size = _valid_size(path)
+        if os.path.exists(path) and os.path.getsize(path) != valid_size:
+            with open(path, 'r+b') as f:
+                f.truncate(valid_size)
+                f.flush()
+                os.fsync(f.fileno())
+        self._file = open(path, 'ab', buffering=buffer_size)
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._lock = threading.Lock()
+        self.sync_interval = sync_interval
+        self.records = 0
+        # Чи є записи, ще не скинуті на диск
+        self._dirty = False
+        # Помилка фонового скидання, повідомляється наступним викликом письменника
+        self._sync_error = None
+
+        self._stopped = threading.Event()
+        self._syncer = None
+        if sync_interval is not None:
+            self._syncer = threading.Thread(target=self._sync_loop, name='archive-sync', daemon=True)
+            self._syncer.start()
+
+    def _sync_loop(self):
+        while not self._stopped.wait(self.sync_interval):
+            with self._lock:
+                if not self._dirty or self._sync_error is not None:
+                    continue
+                try:
+                    self._sync()
+                except OSError as e:
+                    self._sync_error = e
+
+    def _check_sync_error(self):
+        if self._sync_error is not None:
+            error, self._sync_error = self._sync_error, None
+            raise error
+
+    def _write(self, kind: int, fields):
+        lengths = b''.join(_FIELD_LENGTH.pack(len(field)) for field in fields)
+        checksum = zlib.crc32(lengths)
+        for field in fields:
+            checksum = zlib.crc32(field, checksum)
+        with self._lock:
+            self._check_sync_error()
+            self._file.write(_RECORD_HEADER.pack(kind, len(fields), checksum))
+            self._file.write(lengths)
+            for field in fields:
+                self._file.write(field)
+            self.records += 1
+            self._dirty = True
+
+    def write_envelope(self, encrypted_ballot: bytes, encrypted_signature: bytes, aes_key: bytes):
+        """Конверт голосу в тому вигляді, в якому його отримує count_vote"""
+        self._write(RECORD_ENVELOPE, (encrypted_ballot, encrypted_signature, aes_key))
+
+    def write_vote(self, ballot_id: bytes, candidate_number: int | None):
+        """Зарахований голос (той самий запис, що в журналі і на дошці оголошень)"""
+        self.write_vote_record(encode_vote(ballot_id, candidate_number))
+
+    def write_vote_record(self, record: bytes):
+        """Зарахований голос у вигляді вже закодованого запису journal.encode_vote"""
+        self._write(RECORD_VOTE, (record,))
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._dirty = False
+
+    def flush(self):
+        with self._lock:
+            self._check_sync_error()
+            self._sync()
+
+    def close(self):
+        self._stopped.set()
+        if self._syncer is not None:
+            self._syncer.join()
+            self._syncer = None
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ArchiveReader:
+    def __init__(self, path: str):
+        """Відображає архів у пам'ять лише для читання"""
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < len(MAGIC):
+            self._file.close()
+            raise ValueError("Файл не є архівом бюлетенів")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if self._view[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError("Файл не є архівом бюлетенів")
+        # Де закінчився останній цілий запис (після повного проходу)
+        self.valid_size = None
+
+    def scan(self):
+        """
+        Потоком повертає (тип, довжини полів, початок даних) для кожного цілого
+        запису, не створюючи memoryview. Після повного проходу встановлює valid_size.
+        """
+        view = self._view
+        size = len(view)
+        offset = len(MAGIC)
+        while offset + _RECORD_HEADER.size <= size:
+            record_kind, count, checksum = _RECORD_HEADER.unpack_from(view, offset)
+            lengths_start = offset + _RECORD_HEADER.size
+            data_start = lengths_start + count * _FIELD_LENGTH.size
+            if data_start > size:
+                break
+            lengths = struct.unpack_from(f'<{count}I', view, lengths_start)
+            end = data_start + sum(lengths)
+            if end > size:
+                break
+
+            crc = zlib.crc32(view[lengths_start:data_start])
+            crc = zlib.crc32(view[data_start:end], crc)
+            if crc != checksum:
+                break
+
+            yield record_kind, lengths, data_start
+            offset = end
+        self.valid_size = offset
+
+    def records(self, kind: int | None = None):
+        """
+        Потоком повертає (тип, поля) для кожного цілого запису. Поля - memoryview
+        на відображений файл, їх треба відпустити до close().
+
+        :param kind: Лише записи цього типу (None - усі).
+        """
+        view = self._view
+        for record_kind, lengths, data_start in self.scan():
+            if kind is None or record_kind == kind:
+                fields = []
+                position = data_start
+                for length in lengths:
+                    fields.append(view[position:position + length])
+                    position += length
+                yield record_kind, fields
+
+    def envelopes(self):
+        """Потоком повертає конверти (зашифрований бюлетень, зашифрований підпис, aes ключ)"""
+        for _, fields in self.records(RECORD_ENVELOPE):
+            yield tuple(fields)
+
+    def votes(self):
+        """Потоком повертає зараховані голоси (ID бюлетеня, номер кандидата або None)"""
+        for _, (record,) in self.records(RECORD_VOTE):
+            _, ballot_id, candidate_number = decode_record(record)
+            yield bytes(ballot_id), candidate_number
+
+    def envelope_batches(self, batch_size=1024, copy=False):
+        """
+        Пакети конвертів для count_votes_batch.
+
+        :param copy: Копіювати поля в bytes (потрібно для пулу процесів і RSA в cryptography).
+        """
+        batch = []
+        for envelope in self.envelopes():
+            batch.append(tuple(bytes(field) for field in envelope) if copy else envelope)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def close(self):
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Користувач ще тримає memoryview на архів, відображення закриється разом з ними
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def recount(path: str, commission, batch_size=1024, workers=None) -> dict:
+    """
+    Перераховує конверти з архіву через commission.count_votes_batch.
+
+    RSA в cryptography приймає лише bytes, тому поля копіюються в момент
+    передачі пакета, сам архів читається без копіювання.
+
+    :param path: Шлях до архіву.
+    :param commission: Commission або ShardedCommission.
+    :param batch_size: Скільки конвертів подавати одним пакетом.
+    :param workers: Кількість потоків для розшифрування, якщо в комісії немає власного пулу.
+    :return: {'envelopes', 'counted', 'rejected', 'errors'} - errors рахує тексти помилок.
+    """
+    summary = {'envelopes': 0, 'counted': 0, 'rejected': 0, 'errors': {}}
+    with ArchiveReader(path) as reader:
+        for batch in reader.envelope_batches(batch_size, copy=True):
+            if workers is None:
+                results = commission.count_votes_batch(batch)
+            else:
+                results = commission.count_votes_batch(batch, workers)
+            summary['envelopes'] += len(batch)
+            for counted, error in results:
+                if counted:
+                    summary['counted'] += 1
+                else:
+                    summary['rejected'] += 1
+                    summary['errors'][error] = summary['errors'].get(error, 0) + 1
+    return summary
+
+
+def export_bulletin_board(board, path: str) -> int:
+    """Записує всі голоси з дошки оголошень в архів, повертає їх кількість"""
+    count = 0
+    with ArchiveWriter(path) as archive:
+        for _, _, record in board.iter_leaves():
+            archive.write_vote_record(record)
+            count += 1
+    return count
@@ -0,0 +1,44 @@
+"""
+Компактний формат бюлетенів для передачі комісії.
+
+Бюлетень записується одним рядком "ballot_id|voter_id|choice", скринька -
+це рядки бюлетенів, розділені переносом рядка. Кожна скринька шифрується
+одним гібридним конвертом (RSA для ключа AES, AES для вмісту).
+"""
+
+FIELD_SEPARATOR = '|'
+BALLOT_SEPARATOR = '\n'
+
+
+def parse_ballot_text(ballot_text: str) -> str:
+    """
+    Витягує з тексту бюлетеня ідентифікатори та вибір і повертає компактний запис.
+
+    :param ballot_text: Текст бюлетеня, згенерований generate_ballot_text.
+    :return: Рядок "ballot_id|voter_id|choice".
+    """
+    fields = {}
+    for line in ballot_text.split('\n'):
+        key, _, value = line.partition(': ')
+        fields[key] = value.strip()
+
+    return format_ballot(fields['Ідентифікатор бюлетеня'], fields['Ідентифікатор виборця'], fields['Ваш вибір'])
+
+
+def format_ballot(ballot_id, voter_id, voter_choice) -> str:
+    """Компактний запис одного бюлетеня"""
+    parts = [str(ballot_id), str(voter_id), str(voter_choice)]
+    for part in parts:
+        if FIELD_SEPARATOR in part or BALLOT_SEPARATOR in part:
+            raise ValueError("Поле бюлетеня містить службовий символ")
+    return FIELD_SEPARATOR.join(parts)
+
+
+def serialize_ballot_box(ballots: list[str]) -> bytes:
+    """Серіалізує скриньку компактних записів у байти"""
+    return BALLOT_SEPARATOR.join(ballots).encode('utf-8')
+
+
+def deserialize_ballot_box(data: bytes) -> list[str]:
+    """Відновлює список компактних записів зі скриньки"""
+    return data.decode('utf-8').split(BALLOT_SEPARATOR)
@@ -0,0 +1,99 @@
+"""
+Архів бюлетенів: швидкість запису і читання конвертів (memoryview без
+копіювання проти копіювання в bytes) та перерахунок архіву пакетами
+проти поштучного count_vote.
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+from Crypto.PublicKey import RSA
+
+from ballot_archive import ArchiveReader, ArchiveWriter, recount
+from commission import Commission
+from crypto_tools import new_ballot_id
+from encryption_decryption import generate_rsa_keys, rsa_encrypt, hybrid_encrypt
+from benchmarks.common import print_table
+
+
+def make_envelopes(num_ballots, num_candidates, comm_key, sign_key):
+    """Конверти з дійсними підписами (підписуємо без засліплення, результат той самий)"""
+    public_key = comm_key.public_key()
+    envelopes = []
+    for i in range(num_ballots):
+        ballot = f"{new_ballot_id()}|None|{i % num_candidates + 1}"
+        signature = pow(int.from_bytes(ballot.encode('utf-8'), 'big'), sign_key.d, sign_key.n)
+        signature = signature.to_bytes((signature.bit_length() + 7) // 8, 'big')
+        envelopes.append((rsa_encrypt(ballot, public_key), *hybrid_encrypt(signature, public_key)))
+    return envelopes
+
+
+def run(num_ballots, num_candidates, scan_copies, batch_size, directory):
+    comm_key = generate_rsa_keys()[0]
+    # Менший ключ підпису, щоб підготовка конвертів не тривала довше за сам бенчмарк
+    sign_key = RSA.generate(1024)
+    envelopes = make_envelopes(num_ballots, num_candidates, comm_key, sign_key)
+    voter_ids = [hashlib.sha1(str(i).encode('utf-8')).hexdigest() for i in range(num_candidates)]
+    candidates = [f'Кандидат {i + 1}' for i in range(num_candidates)]
+
+    path = os.path.join(directory, 'archive.bin')
+    start = time.perf_counter()
+    with ArchiveWriter(path) as archive:
+        # Для перегляду архів збільшується копіями, перераховується лише перша
+        for _ in range(scan_copies):
+            for envelope in envelopes:
+                archive.write_envelope(*envelope)
+    write_time = time.perf_counter() - start
+    total = num_ballots * scan_copies
+    size_mb = os.path.getsize(path) / 2 ** 20
+
+    rows = [{'step': 'write', 'records': total, 'records_per_s': total / write_time, 'mb_per_s': size_mb / write_time}]
+    for copy in (False, True):
+        with ArchiveReader(path) as reader:
+            start = time.perf_counter()
+            scanned = sum(len(batch) for batch in reader.envelope_batches(batch_size, copy=copy))
+            elapsed = time.perf_counter() - start
+        rows.append({'step': 'scan (bytes)' if copy else 'scan (memoryview)', 'records': scanned,
+                     'records_per_s': scanned / elapsed, 'mb_per_s': size_mb / elapsed})
+
+    recount_path = os.path.join(directory, 'recount.bin')
+    with ArchiveWriter(recount_path) as archive:
+        for envelope in envelopes:
+            archive.write_envelope(*envelope)
+
+    commission = Commission(voter_ids, candidates, keys=(comm_key, sign_key))
+    start = time.perf_counter()
+    with ArchiveReader(recount_path) as reader:
+        for envelope in reader.envelopes():
+            commission.count_vote(*(bytes(field) for field in envelope))
+    elapsed = time.perf_counter() - start
+    rows.append({'step': 'recount (count_vote)', 'records': num_ballots,
+                 'records_per_s': num_ballots / elapsed, 'mb_per_s': float('nan')})
+
+    commission = Commission(voter_ids, candidates, keys=(comm_key, sign_key))
+    start = time.perf_counter()
+    summary = recount(recount_path, commission, batch_size)
+    elapsed = time.perf_counter() - start
+    assert summary['counted'] == num_ballots, summary
+    rows.append({'step': 'recount (batch)', 'records': num_ballots,
+                 'records_per_s': num_ballots / elapsed, 'mb_per_s': float('nan')})
+
+    print_table(rows, ['step', 'records', 'records_per_s', 'mb_per_s'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ballots', type=int, default=2000)
+    parser.add_argument('--candidates', type=int, default=5)
+    parser.add_argument('--scan-copies', type=int, default=100, help='Скільки копій конвертів писати для перегляду')
+    parser.add_argument('--batch-size', type=int, default=512)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        run(args.ballots, args.candidates, args.scan_copies, args.batch_size, directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Затримка реєстрації залежно від кількості скриньок і частки перевірки,
+поруч з імовірністю пропустити набір з однією підробленою скринькою.
+"""
+
+import argparse
+import hashlib
+import time
+
+from commission import Commission, audited_boxes_count, audit_escape_probability
+from main import encrypt_ballot_kit, encrypt_blind_ballots
+from voter import Voter
+from benchmarks.common import print_table
+
+
+def run(num_voters, num_candidates, box_counts, audit_rates):
+    voter_ids = [hashlib.sha1(str(i).encode('utf-8')).hexdigest() for i in range(num_voters)]
+    candidates = [f'Кандидат {i + 1}' for i in range(num_candidates)]
+
+    rows = []
+    for ballot_boxes in box_counts:
+        # Набори виборців готуються один раз для всіх часток перевірки
+        reference = Commission(voter_ids, candidates, ballot_boxes=ballot_boxes)
+        keys = (reference.private_comm_key, reference.bs.key)
+        kits = []
+        for voter_id in voter_ids:
+            voter = Voter(voter_id, candidates, reference.public_sign_key, ballot_boxes=ballot_boxes)
+            kits.append((encrypt_ballot_kit(voter.ballot_kit, reference.public_comm_key),
+                         encrypt_blind_ballots(voter.blind_ballots, reference.public_comm_key)))
+
+        for audit_rate in audit_rates:
+            commission = Commission(voter_ids, candidates, keys=keys, ballot_boxes=ballot_boxes, audit_rate=audit_rate)
+
+            # Перевірка набору окремо від підпису, який від частки перевірки не залежить
+            commission.verify_ballot_kit(kits[0][0])
+            start = time.perf_counter()
+            for ballot_kit, _ in kits:
+                commission.verify_ballot_kit(ballot_kit)
+            verification = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for ballot_kit, blind_ballots in kits:
+                commission.register_ballot(ballot_kit, blind_ballots)
+            elapsed = time.perf_counter() - start
+
+            rows.append({
+                'boxes': ballot_boxes,
+                'audit_rate': audit_rate,
+                'opened': audited_boxes_count(ballot_boxes, audit_rate),
+                'verify_ms': verification / num_voters * 1e3,
+                'register_ms': elapsed / num_voters * 1e3,
+                'escape_prob': audit_escape_probability(ballot_boxes, audit_rate),
+            })
+
+    print_table(rows, ['boxes', 'audit_rate', 'opened', 'verify_ms', 'register_ms', 'escape_prob'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--voters', type=int, default=20)
+    parser.add_argument('--candidates', type=int, default=10)
+    parser.add_argument('--boxes', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--audit-rates', type=float, nargs='+', default=[0.25, 0.5, 0.75, 1.0])
+    args = parser.parse_args()
+    run(args.voters, args.candidates, args.boxes, args.audit_rates)
+
+
+if __name__ == '__main__':
+    main()
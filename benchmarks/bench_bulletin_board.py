@@ -0,0 +1,69 @@
+"""
+Дошка оголошень: час дописування листка, побудови доказу включення і
+підписаного кореня залежно від кількості зарахованих бюлетенів.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bulletin_board import BulletinBoard
+from crypto_tools import BALLOT_ID_SIZE
+from encryption_decryption import generate_rsa_keys
+from journal import encode_vote
+from benchmarks.common import print_table
+
+
+def run(sizes, proofs, directory):
+    private_key, _ = generate_rsa_keys(2048)
+    board = BulletinBoard(directory)
+    rng = random.Random(0)
+
+    rows = []
+    for size in sorted(sizes):
+        added = size - len(board)
+        start = time.perf_counter()
+        for _ in range(added):
+            ballot_id = os.urandom(BALLOT_ID_SIZE)
+            board.append(ballot_id, encode_vote(ballot_id, rng.randint(1, 10)))
+        append_time = (time.perf_counter() - start) / max(added, 1)
+
+        indices = [rng.randrange(size) for _ in range(proofs)]
+        start = time.perf_counter()
+        for index in indices:
+            board.inclusion_proof(index)
+        proof_time = (time.perf_counter() - start) / proofs
+
+        start = time.perf_counter()
+        board.signed_root(private_key)
+        root_time = time.perf_counter() - start
+
+        rows.append({
+            'ballots': size,
+            'append_us': append_time * 1e6,
+            'proof_us': proof_time * 1e6,
+            'proof_hashes': len(board.inclusion_proof(indices[0])),
+            'signed_root_ms': root_time * 1e3,
+        })
+
+    board.close()
+    print_table(rows, ['ballots', 'append_us', 'proof_us', 'proof_hashes', 'signed_root_ms'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--proofs', type=int, default=1000)
+    parser.add_argument('--memory', action='store_true', help='Дошка в пам\'яті замість тимчасового каталогу')
+    args = parser.parse_args()
+    if args.memory:
+        run(args.sizes, args.proofs, None)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            run(args.sizes, args.proofs, directory)
+
+
+if __name__ == '__main__':
+    main()
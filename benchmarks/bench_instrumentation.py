@@ -0,0 +1,56 @@
+"""
+Накладні витрати інструментування: виклик без обгортки, з вимкненими
+і з увімкненими метриками, на порожній функції та на rsa_decrypt.
+"""
+
+import argparse
+
+import instrumentation
+from encryption_decryption import generate_rsa_keys, rsa_encrypt, rsa_decrypt
+from benchmarks.common import best_time, print_table
+
+
+def _noop():
+    return None
+
+
+def run(number):
+    private_key, public_key = generate_rsa_keys()
+    ciphertext = rsa_encrypt('бюлетень', public_key)
+    cases = {
+        'noop': (_noop, instrumentation.timed('bench_noop')(_noop)),
+        'rsa_decrypt': (rsa_decrypt.__wrapped__, rsa_decrypt),
+    }
+
+    rows = []
+    for name, (plain, wrapped) in cases.items():
+        args = () if name == 'noop' else (ciphertext, private_key)
+        calls = number if name == 'noop' else max(1, number // 1000)
+
+        bare = best_time(lambda: plain(*args), number=calls)
+        instrumentation.disable()
+        disabled = best_time(lambda: wrapped(*args), number=calls)
+        instrumentation.enable()
+        enabled = best_time(lambda: wrapped(*args), number=calls)
+        instrumentation.disable()
+
+        rows.append({
+            'operation': name,
+            'bare_us': bare * 1e6,
+            'disabled_us': disabled * 1e6,
+            'enabled_us': enabled * 1e6,
+            'disabled_overhead_us': (disabled - bare) * 1e6,
+        })
+
+    print_table(rows, ['operation', 'bare_us', 'disabled_us', 'enabled_us', 'disabled_overhead_us'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=200_000, help='Викликів порожньої функції в одному вимірюванні')
+    args = parser.parse_args()
+    run(args.number)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Пропускна здатність журналу з груповим комітом: голосів на секунду і
+кількість fsync залежно від вікна group_commit_window і кількості
+паралельних потоків підрахунку.
+"""
+
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+
+from crypto_tools import new_ballot_id
+from journal import Journal, encode_vote
+from benchmarks.common import print_table
+
+
+def run_config(directory, window, threads, votes_per_thread):
+    journal = Journal(directory, group_commit_window=window, snapshot_interval=10 ** 12).open()
+    records = [[encode_vote(bytes.fromhex(new_ballot_id()), 1) for _ in range(votes_per_thread)]
+               for _ in range(threads)]
+
+    def worker(thread_records):
+        for record in thread_records:
+            journal.commit(record)
+
+    workers = [threading.Thread(target=worker, args=(thread_records,)) for thread_records in records]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    journal.close()
+
+    total = threads * votes_per_thread
+    return {
+        'window_ms': window * 1e3,
+        'threads': threads,
+        'votes_s': total / elapsed,
+        'fsyncs': journal.fsync_count,
+        'votes_per_fsync': total / max(journal.fsync_count, 1),
+    }
+
+
+def run(windows, thread_counts, votes_per_thread):
+    rows = []
+    for threads in thread_counts:
+        for window in windows:
+            directory = tempfile.mkdtemp(prefix='journal-bench-')
+            try:
+                rows.append(run_config(directory, window, threads, votes_per_thread))
+            finally:
+                shutil.rmtree(directory)
+    print_table(rows, ['window_ms', 'threads', 'votes_s', 'fsyncs', 'votes_per_fsync'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--windows-ms', type=float, nargs='+', default=[0, 1, 2, 5, 10])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 16, 64])
+    parser.add_argument('--votes', type=int, default=200, help='Голосів на потік')
+    args = parser.parse_args()
+    run([window / 1e3 for window in args.windows_ms], args.threads, args.votes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Вплив живих результатів на підрахунок: пропускна здатність зарахування
+перевірених бюлетенів без стрічки результатів і з частою публікацією та
+малюванням графіків у фоні.
+"""
+
+import argparse
+import hashlib
+import tempfile
+import time
+
+from commission import Commission
+from crypto_tools import new_ballot_id
+from live_results import LiveResults, ChartRenderer
+from benchmarks.common import print_table
+
+
+def count(num_ballots, num_candidates, batch_size, interval, output_dir):
+    voter_ids = [hashlib.sha1(str(i).encode('utf-8')).hexdigest() for i in range(num_ballots)]
+    commission = Commission(voter_ids, [f'Кандидат {i + 1}' for i in range(num_candidates)])
+    ballots = [f"{new_ballot_id()}|None|{i % num_candidates + 1}" for i in range(num_ballots)]
+
+    feed = renderer = None
+    if interval is not None:
+        feed = LiveResults(commission, interval=interval)
+        if output_dir is not None:
+            renderer = ChartRenderer(output_dir)
+            feed.subscribe(renderer.submit)
+        feed.start()
+
+    start = time.perf_counter()
+    for i in range(0, num_ballots, batch_size):
+        commission.record_votes(ballots[i:i + batch_size])
+    elapsed = time.perf_counter() - start
+
+    published = rendered = 0
+    if feed is not None:
+        feed.stop()
+        published = feed.latest()['sequence']
+    if renderer is not None:
+        renderer.close()
+        rendered = renderer.rendered
+    return num_ballots / elapsed, published, rendered
+
+
+def run(num_ballots, num_candidates, batch_size, interval):
+    rows = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for name, feed_interval, chart_dir in [('без стрічки', None, None),
+                                               ('стрічка', interval, None),
+                                               ('стрічка + графік', interval, output_dir)]:
+            votes_per_s, published, rendered = count(num_ballots, num_candidates, batch_size, feed_interval, chart_dir)
+            rows.append({'mode': name, 'votes_per_s': votes_per_s, 'snapshots': published, 'charts': rendered})
+    print_table(rows, ['mode', 'votes_per_s', 'snapshots', 'charts'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ballots', type=int, default=200_000)
+    parser.add_argument('--candidates', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--interval', type=float, default=0.05)
+    args = parser.parse_args()
+    run(args.ballots, args.candidates, args.batch_size, args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+"""
+Мікробенчмарки криптографічних примітивів для кількох розмірів ключа і
+повідомлення, з порівнянням бекендів cryptography і PyCryptodome там, де
+операцію можна виконати обома.
+
+Результати зберігаються в JSON і порівнюються з базовою лінією: операції,
+що сповільнилися більше ніж на поріг, позначаються як регресії, а код
+виходу стає 1.
+
+Приклади:
+    python -m benchmarks.bench_primitives --save-baseline
+    python -m benchmarks.bench_primitives --threshold 0.2
+    python -m benchmarks.bench_primitives --quick --operations rsa_decrypt hybrid_decrypt
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+
+import Crypto
+import cryptography
+from Crypto.Cipher import AES, PKCS1_v1_5
+from Crypto.PublicKey import RSA
+from Crypto.Util.Padding import pad, unpad
+
+from blind_signature import BlindSignature, generate_blinding_factor
+from encryption_decryption import generate_rsa_keys, rsa_encrypt, rsa_decrypt, hybrid_encrypt, hybrid_decrypt
+from benchmarks.common import best_time, print_table
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'primitives.json')
+
+KEY_SIZES = [1024, 2048, 3072]
+PAYLOAD_SIZES = [32, 1024, 16384]
+QUICK_KEY_SIZES = [1024, 2048]
+QUICK_PAYLOAD_SIZES = [32, 1024]
+
+OPERATIONS = ['key_generation', 'blind_message', 'sign_blinded_message', 'unblind_signature', 'verify',
+              'rsa_encrypt', 'rsa_decrypt', 'hybrid_encrypt', 'hybrid_decrypt']
+
+
+class _Keys:
+    """Ключі обох бекендів одного розміру, генеруються один раз"""
+
+    def __init__(self, key_size):
+        self.key_size = key_size
+        self.pycryptodome = RSA.generate(key_size)
+        self.cryptography = generate_rsa_keys(key_size)[0]
+        self.blind = BlindSignature(key=self.pycryptodome)
+
+
+# ----------------------- PyCryptodome -----------------------
+
+def _pycryptodome_hybrid_encrypt(message: bytes, public_key):
+    aes_key, iv = os.urandom(32), os.urandom(16)
+    ciphertext = AES.new(aes_key, AES.MODE_CBC, iv).encrypt(pad(message, AES.block_size))
+    return ciphertext, PKCS1_v1_5.new(public_key).encrypt(aes_key + iv)
+
+
+def _pycryptodome_hybrid_decrypt(ciphertext: bytes, encrypted_key: bytes, private_key):
+    key_iv = PKCS1_v1_5.new(private_key).decrypt(encrypted_key, None)
+    return unpad(AES.new(key_iv[:32], AES.MODE_CBC, key_iv[32:]).decrypt(ciphertext), AES.block_size)
+
+
+def _sign_plain(bs, blinded_message):
+    signed = pow(int.from_bytes(blinded_message, 'big'), bs.key.d, bs.key.n)
+    return signed.to_bytes((signed.bit_length() + 7) // 8, 'big')
+
+
+# ----------------------- Випадки -----------------------
+
+def build_cases(keys: _Keys, payload_sizes):
+    """
+    :return: Список (операція, бекенд, розмір повідомлення або None, функція без аргументів, кількість викликів).
+    """
+    key_size = keys.key_size
+    bs = keys.blind
+    public_bs = bs.publickey()
+    ballot = b'0123456789abcdef0123456789abcdef|None|1'
+    blinded, r_inv = public_bs.blind_message(ballot)
+    signed = bs.sign_blinded_message(blinded)
+    signature = public_bs.unblind_signature(signed, r_inv)
+    factor = generate_blinding_factor(bs.public_key)
+
+    class _OneFactor:
+        """Пул, у якому фактор засліплення завжди готовий (гілка влучання в пул)"""
+
+        def get(self):
+            return factor
+
+    pooled_bs = BlindSignature(key=bs.public_key, blinding_pool=_OneFactor())
+
+    crypto_private = keys.cryptography
+    crypto_public = crypto_private.public_key()
+    dome_private = keys.pycryptodome
+    dome_public = dome_private.publickey()
+    dome_rsa_cipher = PKCS1_v1_5.new(dome_public)
+    dome_rsa_decipher = PKCS1_v1_5.new(dome_private)
+
+    short = ballot[:min(len(ballot), key_size // 8 - 11)]
+    crypto_short = rsa_encrypt(short, crypto_public)
+    dome_short = dome_rsa_cipher.encrypt(short)
+
+    cases = [
+        ('key_generation', 'cryptography', None, lambda: generate_rsa_keys(key_size), 1),
+        ('key_generation', 'pycryptodome', None, lambda: RSA.generate(key_size), 1),
+        ('blind_message', 'python', None, lambda: public_bs.blind_message(ballot), 20),
+        ('blind_message', 'python+pool', None, lambda: pooled_bs.blind_message(ballot), 200),
+        ('sign_blinded_message', 'python-crt', None, lambda: bs.sign_blinded_message(blinded), 10),
+        ('sign_blinded_message', 'python-plain', None, lambda: _sign_plain(bs, blinded), 5),
+        ('unblind_signature', 'python', None, lambda: public_bs.unblind_signature(signed, r_inv), 200),
+        ('verify', 'python', None, lambda: public_bs.verify(ballot, signature), 200),
+        ('rsa_encrypt', 'cryptography', len(short), lambda: rsa_encrypt(short, crypto_public), 200),
+        ('rsa_encrypt', 'pycryptodome', len(short), lambda: dome_rsa_cipher.encrypt(short), 50),
+        ('rsa_decrypt', 'cryptography', len(short), lambda: rsa_decrypt(crypto_short, crypto_private), 20),
+        ('rsa_decrypt', 'pycryptodome', len(short), lambda: dome_rsa_decipher.decrypt(dome_short, None), 20),
+    ]
+
+    for payload_size in payload_sizes:
+        payload = os.urandom(payload_size)
+        crypto_envelope = hybrid_encrypt(payload, crypto_public)
+        dome_envelope = _pycryptodome_hybrid_encrypt(payload, dome_public)
+        cases += [
+            ('hybrid_encrypt', 'cryptography', payload_size,
+             lambda payload=payload: hybrid_encrypt(payload, crypto_public), 100),
+            ('hybrid_encrypt', 'pycryptodome', payload_size,
+             lambda payload=payload: _pycryptodome_hybrid_encrypt(payload, dome_public), 50),
+            ('hybrid_decrypt', 'cryptography', payload_size,
+             lambda envelope=crypto_envelope: hybrid_decrypt(*envelope, crypto_private), 20),
+            ('hybrid_decrypt', 'pycryptodome', payload_size,
+             lambda envelope=dome_envelope: _pycryptodome_hybrid_decrypt(*envelope, dome_private), 20),
+        ]
+
+    return cases
+
+
+def case_key(row) -> str:
+    """Ключ випадку в базовій лінії"""
+    payload = '' if row['payload'] is None else f"/{row['payload']}B"
+    return f"{row['operation']}/{row['backend']}/{row['key_size']}{payload}"
+
+
+def run(key_sizes, payload_sizes, operations, repeat):
+    rows = []
+    for key_size in key_sizes:
+        keys = _Keys(key_size)
+        for operation, backend, payload, func, number in build_cases(keys, payload_sizes):
+            if operation not in operations:
+                continue
+            # Генерація ключа повільна і має великий розкид, для неї менше повторів
+            seconds = best_time(func, repeat=repeat if operation != 'key_generation' else max(1, repeat // 2),
+                                number=number)
+            rows.append({
+                'operation': operation,
+                'backend': backend,
+                'key_size': key_size,
+                'payload': payload,
+                'us': seconds * 1e6,
+                'ops_s': 1 / seconds,
+            })
+    return rows
+
+
+def fastest_backends(rows) -> list[dict]:
+    """Найшвидший бекенд для кожної операції і розміру"""
+    best = {}
+    for row in rows:
+        group = (row['operation'], row['key_size'], row['payload'])
+        if group not in best or row['us'] < best[group]['us']:
+            best[group] = row
+    counts = {}
+    for row in rows:
+        group = (row['operation'], row['key_size'], row['payload'])
+        counts[group] = counts.get(group, 0) + 1
+    return [
+        {'operation': operation, 'key_size': key_size, 'payload': payload, 'fastest': row['backend'],
+         'us': row['us']}
+        for (operation, key_size, payload), row in best.items() if counts[(operation, key_size, payload)] > 1
+    ]
+
+
+def compare(rows, baseline: dict, threshold: float) -> list[dict]:
+    """Порівняння з базовою лінією, повертає рядки з відношенням часу"""
+    compared = []
+    for row in rows:
+        key = case_key(row)
+        if key not in baseline:
+            continue
+        ratio = row['us'] / baseline[key]
+        compared.append({'case': key, 'baseline_us': baseline[key], 'us': row['us'], 'ratio': ratio,
+                         'status': 'REGRESSION' if ratio > 1 + threshold else 'ok'})
+    return compared
+
+
+def environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'cryptography': cryptography.__version__,
+        'pycryptodome': Crypto.__version__,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--key-sizes', type=int, nargs='+', default=None)
+    parser.add_argument('--payload-sizes', type=int, nargs='+', default=None)
+    parser.add_argument('--operations', nargs='+', choices=OPERATIONS, default=OPERATIONS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quick', action='store_true', help='Менше розмірів ключа і повідомлення')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Файл базової лінії JSON')
+    parser.add_argument('--save-baseline', action='store_true', help='Записати результати як нову базову лінію')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Допустиме сповільнення (0.2 = 20%%)')
+    parser.add_argument('--output', default=None, help='Файл для повних результатів JSON')
+    args = parser.parse_args()
+
+    key_sizes = args.key_sizes or (QUICK_KEY_SIZES if args.quick else KEY_SIZES)
+    payload_sizes = args.payload_sizes or (QUICK_PAYLOAD_SIZES if args.quick else PAYLOAD_SIZES)
+    rows = run(key_sizes, payload_sizes, set(args.operations), args.repeat)
+
+    print_table(rows, ['operation', 'backend', 'key_size', 'payload', 'us', 'ops_s'])
+    fastest = fastest_backends(rows)
+    if fastest:
+        print('\nНайшвидший бекенд:')
+        print_table(fastest, ['operation', 'key_size', 'payload', 'fastest', 'us'])
+
+    report = {'environment': environment(), 'results': {case_key(row): row['us'] for row in rows}}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({**report, 'rows': rows}, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'\nБазову лінію записано в {args.baseline}')
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f'\nБазової лінії {args.baseline} немає, запустіть з --save-baseline')
+        return
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline['environment'] != report['environment']:
+        print('\nУвага: базову лінію записано в іншому оточенні, порівняння може бути неточним')
+
+    compared = compare(rows, baseline['results'], args.threshold)
+    if not compared:
+        print('\nУ базовій лінії немає жодного з виміряних випадків')
+        return
+    print(f'\nПорівняння з базовою лінією (поріг {args.threshold:.0%}):')
+    print_table(compared, ['case', 'baseline_us', 'us', 'ratio', 'status'])
+    regressions = [row for row in compared if row['status'] == 'REGRESSION']
+    if regressions:
+        print(f'\nРегресій: {len(regressions)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
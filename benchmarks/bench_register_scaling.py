@@ -0,0 +1,66 @@
+"""
+Пропускна здатність Commission.register_ballot залежно від типу пулу
+і кількості робітників.
+"""
+
+import argparse
+import hashlib
+import time
+
+from commission import Commission, create_executor
+from encryption_decryption import hybrid_encrypt
+from main import encrypt_ballot_kit
+from voter import Voter
+from benchmarks.common import print_table
+
+
+def run(num_voters, num_candidates, worker_counts, kinds):
+    configs = [(None, 1)] + [(kind, workers) for kind in kinds for workers in worker_counts]
+    voter_ids = [hashlib.sha1(str(i).encode('utf-8')).hexdigest() for i in range(num_voters * len(configs))]
+    candidates = [f'Кандидат {i + 1}' for i in range(num_candidates)]
+    commission = Commission(voter_ids, candidates)
+
+    # Бюлетені виборців готуються заздалегідь, вимірюється лише робота комісії
+    requests = []
+    for voter_id in voter_ids:
+        voter = Voter(voter_id, candidates, commission.public_sign_key)
+        requests.append((
+            encrypt_ballot_kit(voter.ballot_kit, commission.public_comm_key),
+            [hybrid_encrypt(ballot, commission.public_comm_key) for ballot in voter.blind_ballots]
+        ))
+
+    rows = []
+    for config_index, (kind, workers) in enumerate(configs):
+        commission.executor = create_executor(kind, workers) if kind else None
+        commission.workers = workers
+        batch = requests[config_index * num_voters:(config_index + 1) * num_voters]
+
+        start = time.perf_counter()
+        for ballot_kit, blind_ballots in batch:
+            commission.register_ballot(ballot_kit, blind_ballots)
+        elapsed = time.perf_counter() - start
+
+        if commission.executor is not None:
+            commission.executor.shutdown()
+        rows.append({
+            'executor': kind or 'inline',
+            'workers': workers,
+            'voters_s': num_voters / elapsed,
+            'ms_per_voter': elapsed / num_voters * 1e3,
+        })
+
+    print_table(rows, ['executor', 'workers', 'voters_s', 'ms_per_voter'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--voters', type=int, default=20)
+    parser.add_argument('--candidates', type=int, default=20)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--kinds', nargs='+', default=['thread', 'process'], choices=['thread', 'process'])
+    args = parser.parse_args()
+    run(args.voters, args.candidates, args.workers, args.kinds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Затримка реєстрації виборця: старе шифрування кожного поля бюлетеня окремим
+RSA проти одного гібридного конверту на скриньку.
+"""
+
+import argparse
+import hashlib
+import time
+
+from ballot_format import parse_ballot_text
+from commission import Commission
+from encryption_decryption import rsa_encrypt, rsa_decrypt
+from main import encrypt_ballot_kit
+from voter import Voter
+from benchmarks.common import print_table
+
+
+def encrypt_ballot_kit_per_field(ballot_kit, public_key):
+    """Старий формат: три RSA шифрування на бюлетень"""
+    encrypted_ballot_kit = []
+    for ballot_box in ballot_kit:
+        encrypted_box = []
+        for ballot_text in ballot_box:
+            ballot_id, voter_id, voter_choice = parse_ballot_text(ballot_text).split('|')
+            encrypted_box.append({
+                'ballot_id': rsa_encrypt(ballot_id, public_key),
+                'voter_id': rsa_encrypt(voter_id, public_key),
+                'voter_choice': rsa_encrypt(voter_choice, public_key),
+            })
+        encrypted_ballot_kit.append(encrypted_box)
+    return encrypted_ballot_kit
+
+
+def check_ballot_kit_per_field(commission, encrypted_ballot_kit):
+    """Стара перевірка на боці комісії: три RSA розшифрування на бюлетень"""
+    voter_index = -1
+    for ballot_box in encrypted_ballot_kit:
+        for ballot in ballot_box:
+            ballot_id = rsa_decrypt(ballot['ballot_id'], commission.private_comm_key)
+            voter_id = rsa_decrypt(ballot['voter_id'], commission.private_comm_key)
+            voter_choice = rsa_decrypt(ballot['voter_choice'], commission.private_comm_key)
+            voter_index = commission.check_ballots_identity(f"{ballot_id}|{voter_id}|{voter_choice}")
+    return voter_index
+
+
+def run(num_voters, num_candidates):
+    voter_ids = [hashlib.sha1(str(i).encode('utf-8')).hexdigest() for i in range(num_voters)]
+    candidates = [f'Кандидат {i + 1}' for i in range(num_candidates)]
+    commission = Commission(voter_ids, candidates)
+
+    timings = {'per_field': [0.0, 0.0], 'envelope': [0.0, 0.0]}
+    for i in range(num_voters):
+        voter = Voter(voter_ids[i], candidates, commission.public_sign_key)
+
+        # Старий формат: три RSA операції на кожне поле бюлетеня
+        start = time.perf_counter()
+        legacy_kit = encrypt_ballot_kit_per_field(voter.ballot_kit, commission.public_comm_key)
+        middle = time.perf_counter()
+        check_ballot_kit_per_field(commission, legacy_kit)
+        timings['per_field'][0] += middle - start
+        timings['per_field'][1] += time.perf_counter() - middle
+
+        # Новий формат: один гібридний конверт на скриньку
+        start = time.perf_counter()
+        kit = encrypt_ballot_kit(voter.ballot_kit, commission.public_comm_key)
+        middle = time.perf_counter()
+        commission.verify_ballot_kit(kit)
+        timings['envelope'][0] += middle - start
+        timings['envelope'][1] += time.perf_counter() - middle
+
+    rows = [
+        {
+            'scheme': scheme,
+            'encrypt_ms': encrypt / num_voters * 1e3,
+            'check_ms': check / num_voters * 1e3,
+        }
+        for scheme, (encrypt, check) in timings.items()
+    ]
+    print_table(rows, ['scheme', 'encrypt_ms', 'check_ms'])
+    print(f"Прискорення перевірки: {timings['per_field'][1] / timings['envelope'][1]:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--voters', type=int, default=10)
+    parser.add_argument('--candidates', type=int, default=5)
+    args = parser.parse_args()
+    run(args.voters, args.candidates)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Швидкість і пам'ять реєстру виборців (VoterRegistry) у порівнянні з
+pandas DataFrame, який використовувався раніше.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from voter_registry import VoterRegistry, DIGEST_SIZE
+from benchmarks.common import best_time, print_table
+
+
+def run(sizes, lookups, pandas_max):
+    rows = []
+    rng = np.random.default_rng(0)
+
+    for size in sizes:
+        digests = np.frombuffer(os.urandom(size * DIGEST_SIZE), dtype=np.uint8).reshape(size, DIGEST_SIZE)
+
+        start = time.perf_counter()
+        registry = VoterRegistry.from_digests(digests)
+        build_s = time.perf_counter() - start
+
+        present = [registry.voter_id(int(i)) for i in rng.integers(0, size, lookups)]
+        missing = [os.urandom(DIGEST_SIZE).hex() for _ in range(lookups)]
+
+        hit_s = best_time(lambda: [registry.index_of(voter_id) for voter_id in present], repeat=3) / lookups
+        miss_s = best_time(lambda: [registry.index_of(voter_id) for voter_id in missing], repeat=3) / lookups
+        registered_s = best_time(
+            lambda: [registry.is_registered(registry.index_of(voter_id)) for voter_id in present], repeat=3
+        ) / lookups
+
+        row = {
+            'voters': size,
+            'build_s': build_s,
+            'lookup_us': hit_s * 1e6,
+            'miss_us': miss_s * 1e6,
+            'has_voted_us': registered_s * 1e6,
+            'registry_mb': registry.nbytes / 2 ** 20,
+            'pandas_mb': '-',
+            'pandas_lookup_us': '-',
+        }
+
+        # Старий варіант: DataFrame з індексом і перевірка через index.tolist()
+        if size <= pandas_max:
+            frame = pd.DataFrame({
+                'tax_number': [registry.voter_id(i) for i in range(size)],
+                'is_registered': np.zeros(size)
+            }).set_index('tax_number')
+            row['pandas_mb'] = frame.memory_usage(deep=True, index=True).sum() / 2 ** 20
+            probe = present[:10]
+            row['pandas_lookup_us'] = best_time(
+                lambda: [voter_id in frame.index.tolist() for voter_id in probe], repeat=1
+            ) / len(probe) * 1e6
+            del frame
+
+        rows.append(row)
+
+    print_table(rows, list(rows[0]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10 ** 6, 10 ** 7])
+    parser.add_argument('--lookups', type=int, default=100_000)
+    parser.add_argument('--pandas-max', type=int, default=10 ** 6,
+                        help='Найбільший розмір реєстру, для якого міряється DataFrame')
+    args = parser.parse_args()
+    run(args.sizes, args.lookups, args.pandas_max)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Локальний навантажувальний тест мережевого сервісу комісії: сервер
+запускається окремим процесом, а задана кількість сесій виборців
+одночасно реєструє бюлетені і голосує через асинхронний клієнт.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from client import CommissionClient
+from main import encrypt_ballot_kit, encrypt_blind_ballots, prepare_vote
+from server import synthetic_voter_ids
+from voter import Voter
+from benchmarks.common import print_table
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def wait_for_server(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return await CommissionClient.connect(port=port)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def session(port, voter, ballot_kit, blind_ballots, choice, comm_key, latencies, errors):
+    start = time.perf_counter()
+    try:
+        async with await CommissionClient.connect(port=port) as client:
+            signatures = await client.register_ballot(ballot_kit, blind_ballots)
+            await client.count_vote(*prepare_vote(voter, signatures, choice, comm_key))
+        latencies.append(time.perf_counter() - start)
+    except (ValueError, ConnectionError) as e:
+        errors.append(str(e))
+
+
+async def run(port, num_sessions, num_candidates):
+    async with await wait_for_server(port) as client:
+        comm_key, sign_key = await client.public_keys()
+
+    # Бюлетені готуються заздалегідь, щоб вимірювати лише сервер
+    voter_ids = synthetic_voter_ids(num_sessions)
+    candidates = [f'Кандидат {i + 1}' for i in range(num_candidates)]
+    prepared = []
+    for i, voter_id in enumerate(voter_ids):
+        voter = Voter(voter_id, candidates, sign_key)
+        prepared.append((voter, encrypt_ballot_kit(voter.ballot_kit, comm_key),
+                         encrypt_blind_ballots(voter.blind_ballots, comm_key), i % num_candidates + 1))
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        session(port, voter, ballot_kit, blind_ballots, choice, comm_key, latencies, errors)
+        for voter, ballot_kit, blind_ballots, choice in prepared
+    ))
+    elapsed = time.perf_counter() - start
+
+    values = np.asarray(latencies or [0.0]) * 1e3
+    print_table([{
+        'sessions': num_sessions,
+        'ok': len(latencies),
+        'errors': len(errors),
+        'sessions_s': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(values, 50)),
+        'p99_ms': float(np.percentile(values, 99)),
+    }], ['sessions', 'ok', 'errors', 'sessions_s', 'p50_ms', 'p99_ms'])
+    if errors:
+        print(f"Перша помилка: {errors[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--candidates', type=int, default=5)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-in-flight', type=int, default=64)
+    args = parser.parse_args()
+
+    server = subprocess.Popen(
+        [sys.executable, 'server.py', '--port', str(args.port), '--synthetic-voters', str(args.sessions),
+         '--candidates', str(args.candidates), '--max-in-flight', str(args.max_in_flight)],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL
+    )
+    try:
+        asyncio.run(run(args.port, args.sessions, args.candidates))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Пропускна здатність шардованої комісії залежно від кількості шардів.
+
+Виборці та їхні зашифровані набори готуються заздалегідь, час міряється лише
+на боці комісії: реєстрація і підрахунок, які паралельно надсилають кілька потоків.
+"""
+
+import argparse
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Crypto.PublicKey import RSA
+
+from encryption_decryption import generate_rsa_keys
+from main import encrypt_ballot_kit, encrypt_blind_ballots, prepare_vote
+from sharded_commission import ShardedCommission
+from voter import Voter
+from benchmarks.common import print_table
+
+
+def prepare_voters(voter_ids, candidates, public_sign_key, public_comm_key):
+    voters = []
+    for voter_id in voter_ids:
+        voter = Voter(voter_id, candidates, public_sign_key)
+        voters.append((
+            voter_id,
+            voter,
+            encrypt_ballot_kit(voter.ballot_kit, public_comm_key),
+            encrypt_blind_ballots(voter.blind_ballots, public_comm_key),
+        ))
+    return voters
+
+
+def run(num_voters, num_candidates, shard_counts, clients):
+    voter_ids = [hashlib.sha1(str(i).encode('utf-8')).hexdigest() for i in range(num_voters)]
+    candidates = [f'Кандидат {i + 1}' for i in range(num_candidates)]
+    # Спільні ключі, щоб одні й ті самі набори підходили всім конфігураціям
+    keys = (generate_rsa_keys()[0], RSA.generate(2048))
+    public_comm_key = keys[0].public_key()
+    voters = prepare_voters(voter_ids, candidates, keys[1].publickey(), public_comm_key)
+
+    rows = []
+    for num_shards in shard_counts:
+        with ShardedCommission(voter_ids, candidates, num_shards, keys=keys) as commission, \
+                ThreadPoolExecutor(max_workers=clients) as pool:
+            # Прогрів процесів шардів
+            commission.get_results()
+
+            start = time.perf_counter()
+            signatures = list(pool.map(lambda v: commission.register_ballot(v[0], v[2], v[3]), voters))
+            registration = time.perf_counter() - start
+
+            envelopes = [
+                prepare_vote(voter, blind_signatures, 1 + i % num_candidates, public_comm_key)
+                for i, ((_, voter, _, _), blind_signatures) in enumerate(zip(voters, signatures))
+            ]
+
+            start = time.perf_counter()
+            list(pool.map(lambda envelope: commission.count_vote(*envelope), envelopes))
+            counting = time.perf_counter() - start
+
+            _, counted, _ = commission.get_results()
+            assert counted == num_voters
+
+        rows.append({
+            'shards': num_shards,
+            'register_per_s': num_voters / registration,
+            'count_per_s': num_voters / counting,
+            'total_per_s': num_voters / (registration + counting),
+        })
+
+    base = rows[0]['total_per_s']
+    for row in rows:
+        row['speedup'] = row['total_per_s'] / base
+    print_table(rows, ['shards', 'register_per_s', 'count_per_s', 'total_per_s', 'speedup'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--voters', type=int, default=40)
+    parser.add_argument('--candidates', type=int, default=5)
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=16, help='Потоків, що одночасно надсилають запити')
+    args = parser.parse_args()
+    run(args.voters, args.candidates, args.shards, args.clients)
+
+
+if __name__ == '__main__':
+    main()
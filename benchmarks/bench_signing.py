@@ -0,0 +1,63 @@
+"""
+Порівняння швидкості сліпого підпису: пряме піднесення до степеня d
+проти підпису за китайською теоремою про залишки та пакетного sign_many.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from blind_signature import BlindSignature
+from benchmarks.common import best_time, print_table
+
+
+def sign_plain(bs, blinded_message):
+    """Старий спосіб підпису без CRT"""
+    signed = pow(int.from_bytes(blinded_message, 'big'), bs.key.d, bs.key.n)
+    return signed.to_bytes((signed.bit_length() + 7) // 8, 'big')
+
+
+def run(key_sizes, batch_size, workers):
+    rows = []
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    for key_size in key_sizes:
+        bs = BlindSignature(key_size)
+        messages = [bs.blind_message(f'{i:010d}|None|{i}')[0] for i in range(batch_size)]
+        assert sign_plain(bs, messages[0]) == bs.sign_blinded_message(messages[0])
+
+        plain = best_time(lambda: [sign_plain(bs, m) for m in messages], repeat=3)
+        crt = best_time(lambda: [bs.sign_blinded_message(m) for m in messages], repeat=3)
+        row = {
+            'key_size': key_size,
+            'plain_sig_s': batch_size / plain,
+            'crt_sig_s': batch_size / crt,
+            'crt_speedup': plain / crt,
+        }
+
+        if executor is not None:
+            pooled = best_time(lambda: bs.sign_many(messages, executor, workers, min_pool_batch=1), repeat=3)
+            row['sign_many_sig_s'] = batch_size / pooled
+
+        rows.append(row)
+
+    if executor is not None:
+        executor.shutdown()
+
+    columns = ['key_size', 'plain_sig_s', 'crt_sig_s', 'crt_speedup']
+    if workers > 1:
+        columns.append('sign_many_sig_s')
+    print_table(rows, columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--key-sizes', type=int, nargs='+', default=[2048, 3072, 4096])
+    parser.add_argument('--batch', type=int, default=64, help='Кількість повідомлень у пакеті')
+    parser.add_argument('--workers', type=int, default=1, help='Процесів для sign_many (1 - без пулу)')
+    args = parser.parse_args()
+
+    run(args.key_sizes, args.batch, args.workers)
+
+
+if __name__ == '__main__':
+    main()
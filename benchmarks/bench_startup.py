@@ -0,0 +1,58 @@
+"""
+Час холодного старту комісії: завантаження реєстру з кешу проти
+хешування при промаху кешу, а також завантаження збережених ключів.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from commission import Commission
+from key_store import load_or_create_commission_keys
+from register_cache import load_register
+from benchmarks.common import print_table
+
+
+def run(sizes, workers):
+    rows = []
+    for size in sizes:
+        directory = tempfile.mkdtemp(prefix='startup-bench-')
+        try:
+            source_path = os.path.join(directory, 'voters.csv')
+            tax_numbers = np.arange(10 ** 9, 10 ** 9 + size, dtype=np.int64)
+            np.savetxt(source_path, tax_numbers, fmt='%d', header='Voter_ID', comments='')
+            cache_dir = os.path.join(directory, 'cache')
+            keys_dir = os.path.join(directory, 'keys')
+            load_or_create_commission_keys(keys_dir)
+
+            start = time.perf_counter()
+            load_register(source_path, cache_dir, workers=workers)
+            miss_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            registry = load_register(source_path, cache_dir)
+            commission = Commission(registry, ['A', 'B'], keys=load_or_create_commission_keys(keys_dir))
+            hit_s = time.perf_counter() - start
+            assert commission.voters_registry.index_of(str(10 ** 9)) == 0
+
+            rows.append({'voters': size, 'cache_miss_s': miss_s, 'cache_hit_start_s': hit_s})
+        finally:
+            shutil.rmtree(directory)
+
+    print_table(rows, ['voters', 'cache_miss_s', 'cache_hit_start_s'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10 ** 6, 10 ** 7])
+    parser.add_argument('--workers', type=int, default=None, help='Процесів для хешування при промаху')
+    args = parser.parse_args()
+    run(args.sizes, args.workers)
+
+
+if __name__ == '__main__':
+    main()
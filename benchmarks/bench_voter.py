@@ -0,0 +1,87 @@
+"""
+Виборець у черзі кіоску: час створення і пам'ять на одного виборця залежно
+від кількості кандидатів.
+
+Режими:
+    lazy     - лише конструктор, бюлетені ще не створені (робота відкладена,
+               це не вартість виборця, а лише вартість місця в черзі);
+    prepared - конструктор, набір скриньок потоком (iter_ballot_kit) і сліпі
+               бюлетені: справжня вартість виборця перед реєстрацією;
+    eager    - конструктор, збережений набір скриньок і сліпі
+               бюлетені (так працював Voter до лінивого створення);
+    voted    - prepared, підпис одного бюлетеня і cast_vote, секрети вже відпущені.
+"""
+
+import argparse
+import hashlib
+import time
+import tracemalloc
+
+from blind_signature import BlindSignature, DEFAULT_SIGN_KEY_SIZE
+from voter import Voter
+from benchmarks.common import print_table
+
+MODES = ['lazy', 'prepared', 'eager', 'voted']
+
+
+def make_voters(voter_ids, candidates, public_sign_key, mode, signer):
+    voters = []
+    for voter_id in voter_ids:
+        voter = Voter(voter_id, candidates, public_sign_key)
+        if mode in ('prepared', 'voted'):
+            # Скриньки потрібні лише для шифрування, тому не зберігаються
+            for _ in voter.iter_ballot_kit():
+                pass
+            voter.blind_ballots
+        elif mode == 'eager':
+            voter.ballot_kit, voter.blind_ballots
+        if mode == 'voted':
+            voter.cast_vote([signer.sign_blinded_message(voter.blind_ballots[0])], 1)
+        voters.append(voter)
+    return voters
+
+
+def measure(voter_ids, candidates, public_sign_key, mode, signer):
+    """
+    Час і пам'ять міряються окремими проходами, бо tracemalloc сповільнює виконання.
+
+    :return: (мс на виборця, байт пам'яті на виборця, що лишаються в черзі).
+    """
+    start = time.perf_counter()
+    make_voters(voter_ids, candidates, public_sign_key, mode, signer)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    voters = make_voters(voter_ids, candidates, public_sign_key, mode, signer)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del voters
+    return elapsed / len(voter_ids) * 1e3, held / len(voter_ids)
+
+
+def run(candidate_counts, queue_size, modes):
+    signer = BlindSignature(DEFAULT_SIGN_KEY_SIZE)
+    public_sign_key = signer.public_key
+    voter_ids = [hashlib.sha1(str(i).encode('utf-8')).hexdigest() for i in range(queue_size)]
+
+    rows = []
+    for num_candidates in candidate_counts:
+        candidates = [f'Кандидат {i + 1}' for i in range(num_candidates)]
+        for mode in modes:
+            ms, held = measure(voter_ids, candidates, public_sign_key, mode, signer)
+            rows.append({'candidates': num_candidates, 'mode': mode, 'ms_per_voter': ms,
+                         'kb_per_voter': held / 1024})
+    print_table(rows, ['candidates', 'mode', 'ms_per_voter', 'kb_per_voter'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--candidates', type=int, nargs='+', default=[10, 50, 100])
+    parser.add_argument('--queue', type=int, default=20, help='Скільки виборців тримати в черзі')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    args = parser.parse_args()
+    run(args.candidates, args.queue, args.modes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Спільні утиліти бенчмарків.
+
+Бенчмарки запускаються з кореня репозиторію, наприклад:
+    python -m benchmarks.bench_signing
+"""
+
+import time
+
+
+def best_time(func, repeat=5, number=1):
+    """
+    Найкращий час одного виклику функції.
+
+    :param func: Функція без аргументів.
+    :param repeat: Кількість повторів вимірювання.
+    :param number: Кількість викликів в одному вимірюванні.
+    :return: Час одного виклику в секундах.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def print_table(rows, columns):
+    """Друкує список словників у вигляді вирівняної таблиці"""
+    widths = [max(len(str(col)), *(len(_format(row[col])) for row in rows)) for col in columns]
+    print('  '.join(str(col).ljust(width) for col, width in zip(columns, widths)))
+    for row in rows:
+        print('  '.join(_format(row[col]).ljust(width) for col, width in zip(columns, widths)))
+
+
+def _format(value):
+    if isinstance(value, float):
+        return f'{value:.4g}'
+    return str(value)
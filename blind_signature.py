@@ -1,12 +1,94 @@
 from Crypto.PublicKey import RSA
-import random
+from functools import partial
+from precompute_pool import PrecomputePool
+from instrumentation import timed
+import math
+import os
+import secrets
+
+# Розмір ключа сліпого підпису комісії, див. benchmarks/bench_primitives.py
+DEFAULT_SIGN_KEY_SIZE = 2048
+
+
+def generate_blinding_factor(public_key) -> tuple[int, int, int]:
+    """
+    Фактор засліплення з криптографічно стійкого генератора.
+
+    :return: Трійка (r, r^e mod n, r^-1 mod n), r взаємно простий з n.
+    """
+    n, e = public_key.n, public_key.e
+    while True:
+        r = secrets.randbelow(n - 2) + 2
+        if math.gcd(r, n) == 1:
+            break
+    return r, pow(r, e, n), pow(r, -1, n)
+
+
+def create_blinding_pool(public_key, size=64) -> PrecomputePool:
+    """Пул факторів засліплення для ключа, поповнюється у фоновому потоці"""
+    return PrecomputePool(partial(generate_blinding_factor, public_key), size=size, name='blinding_factors')
+
+
+def crt_sign(blinded_message, crt_params):
+    """
+    Підпис за китайською теоремою про залишки: два піднесення за модулями p і q.
+    Модульна функція, щоб підписувати в робітниках пулу процесів.
+
+    :param crt_params: BlindSignature.crt_params.
+    """
+    p, q, dp, dq, u, n, e = crt_params
+    c = int.from_bytes(blinded_message, 'big')
+
+    m1 = pow(c % p, dp, p)
+    m2 = pow(c % q, dq, q)
+    # u = p^-1 mod q (так зберігає PyCryptodome)
+    h = ((m2 - m1) * u) % q
+    signed = m1 + h * p
+
+    # Перевірка результату, як у PyCryptodome: один хибний підпис за CRT
+    # (атака Bellcore) видає p і q, а засліплене повідомлення обирає виборець
+    if pow(signed, e, n) != c % n:
+        raise ValueError("Помилка обчислення підпису")
+
+    return signed.to_bytes((signed.bit_length() + 7) // 8, 'big')
+
+
+def _crt_sign_chunk(blinded_messages, crt_params):
+    """Підпис частини пакета, виконується в окремому процесі чи потоці"""
+    return [crt_sign(message, crt_params) for message in blinded_messages]
+
 
 class BlindSignature:
-    def __init__(self, key_size=2048):
-        # Генерація RSA ключів
-        self.key = RSA.generate(key_size)
+    def __init__(self, key_size=DEFAULT_SIGN_KEY_SIZE, key=None, blinding_pool=None):
+        """
+        :param key_size: Розмір ключа, якщо ключ генерується.
+        :param key: Готовий ключ RSA (PyCryptodome), можна лише публічний.
+        :param blinding_pool: Пул факторів засліплення для цього ключа (create_blinding_pool).
+        """
+        # Генерація RSA ключів, якщо готовий ключ не передано
+        self.key = key if key is not None else RSA.generate(key_size)
         self.public_key = self.key.publickey()
+        self.blinding_pool = blinding_pool
+
+        # Параметри для прискореного підпису (лише якщо є приватна частина ключа)
+        if self.key.has_private():
+            p, q, d = self.key.p, self.key.q, self.key.d
+            self._crt_params = (p, q, d % (p - 1), d % (q - 1), self.key.u, self.key.n, self.key.e)
+        else:
+            self._crt_params = None
 
+    @property
+    def crt_params(self) -> tuple:
+        """Параметри приватного ключа для crt_sign (передаються робітникам пулу)"""
+        if self._crt_params is None:
+            raise ValueError("Для підпису потрібен приватний ключ")
+        return self._crt_params
+
+    def publickey(self):
+        """Об'єкт лише з публічним ключем, який можна передати виборцю"""
+        return BlindSignature(key=self.public_key)
+
+    @timed('blind_message')
     def blind_message(self, message):
         """Засліплення повідомлення"""
         # Якщо повідомлення рядок, то переводимо в байти
@@ -14,45 +96,92 @@ class BlindSignature:
             message = message.encode('utf-8')
 
         n = self.public_key.n
-        e = self.public_key.e
 
-        # Генерація фактора засліплення
-        while True:
-            r = random.randint(2, n - 1)
-            if pow(r, 1, n) != 0:
-                break
+        # Фактор засліплення з пулу, якщо пул порожній чи відсутній - обчислюємо на місці
+        if self.blinding_pool is not None:
+            _, r_e, r_inv = self.blinding_pool.get()
+        else:
+            _, r_e, r_inv = generate_blinding_factor(self.public_key)
 
         # Перетворення повідомлення в число
         m = int.from_bytes(message, 'big')
 
         # Засліплення
-        blinded_m = (m * pow(r, e, n)) % n
+        blinded_m = (m * r_e) % n
         blinded_bytes = blinded_m.to_bytes((blinded_m.bit_length() + 7) // 8, 'big')
 
-        return blinded_bytes, r
+        # Для розсліплення потрібен лише обернений елемент
+        return blinded_bytes, r_inv
 
+    @timed('sign_blinded_message')
     def sign_blinded_message(self, blinded_message):
         """Підписання засліпленого повідомлення"""
-        blinded_int = int.from_bytes(blinded_message, 'big')
-        signed = pow(blinded_int, self.key.d, self.key.n)
-        return signed.to_bytes((signed.bit_length() + 7) // 8, 'big')
+        if self._crt_params is None:
+            raise ValueError("Для підпису потрібен приватний ключ")
+        return crt_sign(blinded_message, self._crt_params)
 
-    def unblind_signature(self, signed_blinded, r):
-        """Розсліплення підпису"""
-        n = self.key.n
-        signed_int = int.from_bytes(signed_blinded, 'big')
+    @timed('sign_many')
+    def sign_many(self, blinded_messages, executor=None, workers=None, min_pool_batch=64):
+        """
+        Підписання пакета засліплених повідомлень.
+
+        :param blinded_messages: Список засліплених повідомлень.
+        :param executor: Пул процесів (concurrent.futures) для великих пакетів. Пул потоків
+            не прискорює підпис: pow на чистому Python тримає GIL.
+        :param workers: Кількість робітників executor (None - за кількістю ядер).
+        :param min_pool_batch: Менші за цей розмір пакети підписуються в поточному потоці.
+        :return: Список підписів у тому ж порядку.
+        """
+        if self._crt_params is None:
+            raise ValueError("Для підпису потрібен приватний ключ")
 
-        # Знаходження оберненого елементу
-        r_inv = pow(r, -1, n)
+        blinded_messages = list(blinded_messages)
+        if executor is None or len(blinded_messages) < min_pool_batch:
+            return _crt_sign_chunk(blinded_messages, self._crt_params)
+
+        # Ділимо пакет на частини, щоб не передавати кожне повідомлення окремо
+        workers = workers or os.cpu_count() or 1
+        chunk_size = -(-len(blinded_messages) // (workers * 4))
+        chunks = [blinded_messages[i:i + chunk_size] for i in range(0, len(blinded_messages), chunk_size)]
+        futures = [executor.submit(_crt_sign_chunk, chunk, self._crt_params) for chunk in chunks]
+
+        signatures = []
+        for future in futures:
+            signatures.extend(future.result())
+        return signatures
+
+    @timed('unblind_signature')
+    def unblind_signature(self, signed_blinded, r_inv):
+        """Розсліплення підпису оберненим фактором засліплення, який повернув blind_message"""
+        n = self.public_key.n
+        signed_int = int.from_bytes(signed_blinded, 'big')
 
         unblinded = (signed_int * r_inv) % n
         return unblinded.to_bytes((unblinded.bit_length() + 7) // 8, 'big')
 
-    def verify(self, message: bytes, signature: bytes):
-        """Перевірка підпису"""
+    def _verify(self, message: bytes, signature: bytes) -> bool:
+        """Пряма перевірка, значення поза межами модуля недійсні (s + n дало б той самий s^e mod n)"""
+        n = self.public_key.n
         m = int.from_bytes(message, 'big')
         sig = int.from_bytes(signature, 'big')
+        return m < n and sig < n and pow(sig, self.public_key.e, n) == m
+
+    @timed('verify_signature')
+    def verify(self, message: bytes, signature: bytes):
+        """Перевірка підпису"""
+        return self._verify(message, signature)
+
+    @timed('verify_batch')
+    def verify_batch(self, messages: list[bytes], signatures: list[bytes]) -> list[bool]:
+        """
+        Пакетна перевірка підписів з тими самими правилами, що й verify. Для
+        e = 65537 пряма перевірка кожного підпису дешевша за тест пакета з
+        випадковими показниками, тому підписи перевіряються по одному.
 
-        # Пряма перевірка
-        verified = pow(sig, self.public_key.e, self.public_key.n) == m
-        return verified
\ No newline at end of file
+        :param messages: Список повідомлень.
+        :param signatures: Список підписів у тому ж порядку.
+        :return: Список результатів перевірки для кожного підпису.
+        """
+        if len(messages) != len(signatures):
+            raise ValueError("Кількість повідомлень і підписів не збігається")
+        return [self._verify(message, signature) for message, signature in zip(messages, signatures)]
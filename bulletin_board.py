@@ -0,0 +1,359 @@
+"""
+Дошка оголошень: дерево Меркла лише на дописування над зарахованими бюлетенями.
+
+Листок - двійковий запис голосу (journal.encode_vote), хеші за RFC 6962:
+листок SHA-256(0x00 || дані), вузол SHA-256(0x01 || лівий || правий).
+Кожен рівень дерева зберігається окремим файлом level_K.bin з хешами повних
+піддерев розміру 2^K, тому дописування коштує амортизовано O(1) записів і
+O(log n) хешів для оновлення кореня, а доказ включення читає O(log n) хешів.
+Самі листки послідовно пишуться в leaves.bin і читаються потоком.
+
+Корінь підписується приватним ключем зв'язку комісії (RSA PKCS#1 v1.5, SHA-256),
+підпис не залежить від кількості бюлетенів.
+"""
+
+import hashlib
+import io
+import os
+import struct
+import threading
+import time
+from array import array
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+
+HASH_SIZE = 32
+LEAVES_NAME = 'leaves.bin'
+
+_LEAF_HEADER = struct.Struct('<HI')
+_ROOT_MESSAGE = struct.Struct('<8sQQ32s')
+_ROOT_DOMAIN = b'VBROOT1\x00'
+
+
+def leaf_hash(leaf: bytes) -> bytes:
+    return hashlib.sha256(b'\x00' + leaf).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b'\x01' + left + right).digest()
+
+
+def _split(size: int) -> int:
+    """Найбільший степінь двійки, менший за size"""
+    return 1 << ((size - 1).bit_length() - 1)
+
+
+def verify_inclusion(leaf: bytes, index: int, tree_size: int, proof: list[bytes], root: bytes) -> bool:
+    """
+    Перевіряє доказ включення листка (RFC 6962, 2.1.1) без доступу до дошки.
+
+    :param leaf: Дані листка.
+    :param index: Позиція листка.
+    :param tree_size: Розмір дерева, для якого отримано корінь.
+    :param proof: Хеші сусідів від листка до кореня.
+    :param root: Очікуваний корінь.
+    """
+    if not 0 <= index < tree_size:
+        return False
+
+    # Обхід від кореня до листка визначає, з якого боку кожен сусід
+    sides = []
+    start, size = 0, tree_size
+    while size > 1:
+        k = _split(size)
+        if index < start + k:
+            sides.append(False)
+            size = k
+        else:
+            sides.append(True)
+            start, size = start + k, size - k
+    if len(sides) != len(proof):
+        return False
+
+    h = leaf_hash(leaf)
+    for sibling, is_right_child in zip(proof, reversed(sides)):
+        h = node_hash(sibling, h) if is_right_child else node_hash(h, sibling)
+    return h == root
+
+
+def _root_message(tree_size: int, timestamp: int, root: bytes) -> bytes:
+    return _ROOT_MESSAGE.pack(_ROOT_DOMAIN, tree_size, timestamp, root)
+
+
+def verify_signed_root(snapshot: dict, public_key) -> bool:
+    """Перевіряє підпис знімка кореня публічним ключем зв'язку комісії"""
+    message = _root_message(snapshot['tree_size'], snapshot['timestamp'], snapshot['root'])
+    try:
+        public_key.verify(snapshot['signature'], message, padding.PKCS1v15(), hashes.SHA256())
+    except InvalidSignature:
+        return False
+    return True
+
+
+class BulletinBoard:
+    def __init__(self, directory: str | None = None):
+        """
+        :param directory: Каталог для листків і рівнів дерева. None - дошка в пам'яті.
+        """
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._levels = []
+        # Позиції записів у файлі листків і позиції листків за ключем (ID бюлетеня)
+        self._offsets = array('Q')
+        self._index = {}
+        # Останній хеш кожного рівня, з них складається корінь
+        self._frontier = []
+        self._root = hashlib.sha256(b'').digest()
+        self._signed_root = None
+
+        self._leaves = self._open_file(LEAVES_NAME)
+        self._load()
+
+    def _open_file(self, name: str):
+        if self.directory is None:
+            return io.BytesIO()
+        path = os.path.join(self.directory, name)
+        return open(path, 'r+b' if os.path.exists(path) else 'w+b')
+
+    def _level(self, k: int):
+        while len(self._levels) <= k:
+            self._levels.append(self._open_file(f'level_{len(self._levels)}.bin'))
+        return self._levels[k]
+
+    # ----------------------- Відновлення -----------------------
+
+    def _load(self):
+        """Читає листки потоком, відкидає обірваний хвіст і звіряє рівні з листками"""
+        self._leaves.seek(0)
+        offset = 0
+        leaf_hashes = []
+        while True:
+            header = self._leaves.read(_LEAF_HEADER.size)
+            if len(header) < _LEAF_HEADER.size:
+                break
+            key_size, leaf_size = _LEAF_HEADER.unpack(header)
+            body = self._leaves.read(key_size + leaf_size)
+            if len(body) < key_size + leaf_size:
+                break
+            self._index[body[:key_size]] = len(self._offsets)
+            self._offsets.append(offset)
+            leaf_hashes.append(leaf_hash(body[key_size:]))
+            offset += _LEAF_HEADER.size + key_size + leaf_size
+        self._leaves.truncate(offset)
+
+        size = len(self._offsets)
+        depth = size.bit_length()
+        # Рівні вище за висоту дерева лишаються від обірваного хвоста
+        k = depth
+        while self.directory is not None and os.path.exists(os.path.join(self.directory, f'level_{k}.bin')):
+            self._level(k).truncate(0)
+            k += 1
+        if not size:
+            return
+
+        # Рівні мають містити рівно size >> K хешів, інакше перебудовуємо їх з листків
+        consistent = all(self._file_size(self._level(k)) >= (size >> k) * HASH_SIZE for k in range(depth))
+        if consistent:
+            for k in range(depth):
+                self._level(k).truncate((size >> k) * HASH_SIZE)
+        else:
+            self._rebuild_levels(leaf_hashes)
+
+        self._frontier = [self._read_hash(k, (size >> k) - 1) for k in range(depth)]
+        self._root = self._compute_root()
+
+    @staticmethod
+    def _file_size(f) -> int:
+        return f.seek(0, io.SEEK_END)
+
+    def _rebuild_levels(self, leaf_hashes: list[bytes]):
+        level = leaf_hashes
+        k = 0
+        while level:
+            f = self._level(k)
+            f.seek(0)
+            f.truncate()
+            f.write(b''.join(level))
+            level = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            k += 1
+
+    # ----------------------- Дописування -----------------------
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._index
+
+    def append(self, key: bytes, leaf: bytes) -> int:
+        """
+        Дописує листок. Повторний ключ не дописується, тому відтворення журналу
+        ідемпотентне.
+
+        :param key: Унікальний ключ листка (ID бюлетеня).
+        :param leaf: Дані листка.
+        :return: Позиція листка.
+        """
+        with self._lock:
+            index = self._index.get(key)
+            if index is not None:
+                return index
+
+            index = len(self._offsets)
+            offset = self._file_size(self._leaves)
+            self._leaves.write(_LEAF_HEADER.pack(len(key), len(leaf)) + key + leaf)
+            self._offsets.append(offset)
+            self._index[key] = index
+
+            # Як у двійковому лічильнику: кожна одиниця в кінці номера закриває повне піддерево
+            h = leaf_hash(leaf)
+            k = 0
+            position = index
+            while True:
+                level = self._level(k)
+                level.seek(0, io.SEEK_END)
+                level.write(h)
+                if k < len(self._frontier):
+                    left = self._frontier[k]
+                    self._frontier[k] = h
+                else:
+                    self._frontier.append(h)
+                if not position & 1:
+                    break
+                h = node_hash(left, h)
+                position >>= 1
+                k += 1
+
+            self._root = self._compute_root()
+            return index
+
+    def _compute_root(self) -> bytes:
+        """Корінь з останніх повних піддерев, O(log n)"""
+        size = len(self._offsets)
+        root = None
+        for k, h in enumerate(self._frontier):
+            if size >> k & 1:
+                root = h if root is None else node_hash(h, root)
+        return root if root is not None else hashlib.sha256(b'').digest()
+
+    # ----------------------- Читання -----------------------
+
+    def root(self) -> tuple[int, bytes]:
+        """Поточні (розмір дерева, корінь)"""
+        with self._lock:
+            return len(self._offsets), self._root
+
+    def index_of(self, key: bytes) -> int:
+        """Позиція листка за ключем, -1 якщо його немає"""
+        return self._index.get(key, -1)
+
+    def leaf(self, index: int) -> bytes:
+        with self._lock:
+            self._leaves.seek(self._offsets[index])
+            key_size, leaf_size = _LEAF_HEADER.unpack(self._leaves.read(_LEAF_HEADER.size))
+            return self._leaves.read(key_size + leaf_size)[key_size:]
+
+    def iter_leaves(self, start=0, chunk_size=1 << 16):
+        """Потоком повертає (позиція, ключ, листок), не читаючи файл повністю"""
+        with self._lock:
+            if start >= len(self._offsets):
+                return
+            position = self._offsets[start]
+            end = self._file_size(self._leaves)
+
+        index = start
+        pending = b''
+        while position < end:
+            with self._lock:
+                self._leaves.seek(position)
+                chunk = self._leaves.read(min(chunk_size, end - position))
+            position += len(chunk)
+            pending += chunk
+            offset = 0
+            while offset + _LEAF_HEADER.size <= len(pending):
+                key_size, leaf_size = _LEAF_HEADER.unpack_from(pending, offset)
+                record_end = offset + _LEAF_HEADER.size + key_size + leaf_size
+                if record_end > len(pending):
+                    break
+                key = pending[offset + _LEAF_HEADER.size:offset + _LEAF_HEADER.size + key_size]
+                yield index, key, pending[record_end - leaf_size:record_end]
+                index += 1
+                offset = record_end
+            pending = pending[offset:]
+
+    def _read_hash(self, k: int, i: int) -> bytes:
+        level = self._level(k)
+        level.seek(i * HASH_SIZE)
+        return level.read(HASH_SIZE)
+
+    def _subtree_hash(self, start: int, size: int) -> bytes:
+        """Хеш піддерева [start, start + size) з RFC 6962, повні піддерева читаються з рівнів"""
+        if size & (size - 1) == 0:
+            k = size.bit_length() - 1
+            return self._read_hash(k, start >> k)
+        k = _split(size)
+        return node_hash(self._subtree_hash(start, k), self._subtree_hash(start + k, size - k))
+
+    def inclusion_proof(self, index: int, tree_size: int | None = None) -> list[bytes]:
+        """
+        Доказ включення листка в дерево розміру tree_size (за замовчуванням поточне).
+
+        :return: Хеші сусідів від листка до кореня, див. verify_inclusion.
+        """
+        with self._lock:
+            if tree_size is None:
+                tree_size = len(self._offsets)
+            if not 0 <= index < tree_size <= len(self._offsets):
+                raise ValueError("Листка з такою позицією немає в дереві такого розміру")
+
+            proof = []
+            start, size = 0, tree_size
+            while size > 1:
+                k = _split(size)
+                if index < start + k:
+                    proof.append(self._subtree_hash(start + k, size - k))
+                    size = k
+                else:
+                    proof.append(self._subtree_hash(start, k))
+                    start, size = start + k, size - k
+            proof.reverse()
+            return proof
+
+    def signed_root(self, private_key) -> dict:
+        """
+        Підписаний знімок кореня. Повторний запит без нових листків повертає той самий знімок.
+
+        :param private_key: Приватний ключ зв'язку комісії (cryptography RSA).
+        :return: {'tree_size', 'timestamp', 'root', 'signature'}.
+        """
+        tree_size, root = self.root()
+        snapshot = self._signed_root
+        if snapshot is not None and snapshot['tree_size'] == tree_size:
+            return snapshot
+
+        timestamp = time.time_ns() // 1_000_000
+        signature = private_key.sign(_root_message(tree_size, timestamp, root), padding.PKCS1v15(), hashes.SHA256())
+        snapshot = {'tree_size': tree_size, 'timestamp': timestamp, 'root': root, 'signature': signature}
+        self._signed_root = snapshot
+        return snapshot
+
+    # ----------------------- Запис на диск -----------------------
+
+    def flush(self):
+        """Записує на диск усе дописане"""
+        with self._lock:
+            for f in [self._leaves, *self._levels]:
+                f.flush()
+                if self.directory is not None:
+                    os.fsync(f.fileno())
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            for f in [self._leaves, *self._levels]:
+                f.close()
@@ -0,0 +1,105 @@
+"""
+Асинхронний клієнт мережевого сервісу комісії (server.py).
+"""
+
+import asyncio
+import itertools
+
+from Crypto.PublicKey import RSA
+from cryptography.hazmat.primitives import serialization
+
+from server import DEFAULT_MAX_FRAME_SIZE, read_frame, write_frame, encode_bytes, decode_bytes, decode_root
+
+
+class CommissionClient:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 max_frame_size=DEFAULT_MAX_FRAME_SIZE):
+        self._reader = reader
+        self._writer = writer
+        self._max_frame_size = max_frame_size
+        self._ids = itertools.count(1)
+        # Запити однієї сесії йдуть по черзі
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=8765):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _call(self, method: str, params: dict | None = None) -> dict:
+        async with self._lock:
+            request_id = next(self._ids)
+            write_frame(self._writer, {'id': request_id, 'method': method, 'params': params or {}})
+            await self._writer.drain()
+            response = await read_frame(self._reader, self._max_frame_size)
+
+        if response is None:
+            raise ConnectionError("Сервер закрив з'єднання")
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response['result']
+
+    async def public_keys(self):
+        """
+        :return: (публічний ключ зв'язку cryptography, публічний ключ підпису PyCryptodome).
+        """
+        result = await self._call('public_keys')
+        comm_key = serialization.load_pem_public_key(result['comm_key'].encode('ascii'))
+        sign_key = RSA.import_key(result['sign_key'])
+        return comm_key, sign_key
+
+    async def register_ballot(self, ballot_kit: list[tuple[bytes, bytes]],
+                              blind_ballots: list[tuple[bytes, bytes]]) -> list[bytes]:
+        """Реєстрація зашифрованого набору бюлетенів, повертає сліпі підписи"""
+        result = await self._call('register', {
+            'ballot_kit': [[encode_bytes(box), encode_bytes(key)] for box, key in ballot_kit],
+            'blind_ballots': [[encode_bytes(ballot), encode_bytes(key)] for ballot, key in blind_ballots],
+        })
+        return [decode_bytes(signature) for signature in result['signatures']]
+
+    async def count_vote(self, encrypted_ballot: bytes, encrypted_signature: bytes, aes_key: bytes):
+        """Передача голосу на підрахунок"""
+        await self._call('count', {
+            'ballot': encode_bytes(encrypted_ballot),
+            'signature': encode_bytes(encrypted_signature),
+            'aes_key': encode_bytes(aes_key),
+        })
+
+    async def bulletin_root(self) -> dict:
+        """Підписаний корінь дошки оголошень, див. bulletin_board.verify_signed_root"""
+        return decode_root(await self._call('board_root'))
+
+    async def inclusion_proof(self, ballot_id: str) -> dict:
+        """Доказ зарахування бюлетеня, див. bulletin_board.verify_inclusion"""
+        result = await self._call('inclusion_proof', {'ballot_id': ballot_id})
+        return {
+            'index': result['index'],
+            'leaf': decode_bytes(result['leaf']),
+            'proof': [decode_bytes(h) for h in result['proof']],
+            'root': decode_root(result['root']),
+        }
+
+    async def results(self, after: int | None = None, timeout=30.0) -> dict | None:
+        """
+        Знімок живих результатів. Якщо передано after, чекає знімка з більшим номером
+        (довге опитування для дашбордів).
+        """
+        params = {} if after is None else {'after': after, 'timeout': timeout}
+        return (await self._call('results', params))['snapshot']
+
+    async def metrics(self, prometheus=False) -> dict:
+        """Метрики сервера, див. instrumentation"""
+        return await self._call('metrics', {'format': 'prometheus' if prometheus else 'json'})
@@ -1,129 +1,650 @@
 from encryption_decryption import *
 #from Blinding_and_Signatures import *
-from blind_signature import BlindSignature
-import pandas as pd
+from blind_signature import BlindSignature, crt_sign
+from voter_registry import VoterRegistry
+from ballot_format import deserialize_ballot_box
+from vote_tally import VoteTally
+from crypto_tools import ballot_id_to_bytes
+from instrumentation import timed, increment
+from journal import encode_registration, encode_vote, decode_record, RECORD_REGISTRATION, MAX_BALLOT_ID_SIZE
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from cryptography.hazmat.primitives import serialization
+from functools import lru_cache
 import numpy as np
+import math
+import os
+import secrets
+import struct
+import threading
+import zlib
+
+# Знімок: crc32 тіла, розміри частин і контрольна сума реєстру, за позиціями якого збережено реєстрації
+_SNAPSHOT_MAGIC = b'CSNAP2'
+_SNAPSHOT_HEADER = struct.Struct('<IQQQ32s')
+
+# Скільки скриньок виборець надсилає на перевірку і яку частку з них комісія відкриває
+DEFAULT_BALLOT_BOXES = 4
+DEFAULT_AUDIT_RATE = 1.0
+
+_audit_random = secrets.SystemRandom()
+
+
+def create_executor(kind='thread', workers=None):
+    """
+    Створює пул для розшифрування, перевірки і підпису бюлетенів.
+
+    :param kind: 'thread' (RSA та AES у cryptography відпускають GIL) або 'process'.
+        Сліпий підпис рахується через pow на чистому Python, який тримає GIL, тому
+        пул потоків прискорює лише розшифрування, а підпис пакетів - тільки пул процесів.
+    :param workers: Кількість робітників (None - за кількістю ядер).
+    """
+    if kind == 'thread':
+        return ThreadPoolExecutor(max_workers=workers)
+    if kind == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+    raise ValueError(f"Невідомий тип пулу: {kind}")
+
+
+@lru_cache(maxsize=4)
+def _load_private_key(private_key_der: bytes):
+    """Ключ передається робітникам у DER, щоб працював і пул процесів"""
+    return serialization.load_der_private_key(private_key_der, password=None)
+
+
+def audited_boxes_count(ballot_boxes: int, audit_rate: float) -> int:
+    """Скільки скриньок з набору відкриває комісія (хоча б одну, щоб встановити виборця)"""
+    return min(ballot_boxes, max(1, math.ceil(ballot_boxes * audit_rate)))
+
+
+def audit_escape_probability(ballot_boxes: int, audit_rate: float, tampered_boxes=1) -> float:
+    """
+    Імовірність, що жодна з підроблених скриньок не потрапить до перевірки.
+
+    Комісія відкриває m = audited_boxes_count(...) з k скриньок навмання, тому
+    набір з t підробленими скриньками проходить з імовірністю C(k - t, m) / C(k, m).
+    """
+    audited = audited_boxes_count(ballot_boxes, audit_rate)
+    return math.comb(ballot_boxes - tampered_boxes, audited) / math.comb(ballot_boxes, audited)
+
+
+def _parse_ballot(current_ballot: str, num_candidates: int) -> str:
+    """Перевірка формату бюлетеня і вибору кандидата, повертає ID виборця"""
+    # Розбиваємо бюлетені на компоненти
+    current_ballot_parts = current_ballot.split('|')
+
+    # Перевірка формату бюлетеня
+    if len(current_ballot_parts) != 3:
+        raise ValueError("Бюлетень складений некоректно")
+
+    # Перевірка коректності вибору кандидата
+    voter_choice = int(current_ballot_parts[2])
+    if voter_choice < 1 or voter_choice > num_candidates:
+        raise ValueError("Неправильний вибір кандидата")
+
+    return current_ballot_parts[1]
+
+
+def _open_ballot_box(private_key_der: bytes, encrypted_box: bytes, encrypted_aes_key: bytes, num_candidates: int) -> list[str]:
+    """Розшифровує скриньку і перевіряє її бюлетені, повертає ID виборців"""
+    try:
+        ballot_box = deserialize_ballot_box(hybrid_decrypt(encrypted_box, encrypted_aes_key, _load_private_key(private_key_der)))
+    except ValueError as e:
+        raise ValueError(f"не вдалося розшифрувати ({e})") from e
+
+    voter_ids = []
+    for ballot_index, current_ballot in enumerate(ballot_box):
+        try:
+            voter_ids.append(_parse_ballot(current_ballot, num_candidates))
+        except ValueError as e:
+            raise ValueError(f"бюлетень {ballot_index + 1}: {e}") from e
+    return voter_ids
+
+
+def _open_and_sign_blind_ballots(private_key_der: bytes, crt_params: tuple, first_index: int,
+                                 blind_ballots: list[tuple[bytes, bytes]]) -> list[bytes]:
+    """
+    Розшифровує і підписує частину сліпих бюлетенів одним завданням робітника,
+    щоб ключ і бюлетені передавались у процес один раз на частину.
+
+    :param first_index: Номер першого бюлетеня частини в пакеті (для повідомлень про помилки).
+    """
+    private_key = _load_private_key(private_key_der)
+    signatures = []
+    for offset, (hidden_ballot, encrypted_aes_key) in enumerate(blind_ballots):
+        try:
+            blinded_ballot = hybrid_decrypt(hidden_ballot, encrypted_aes_key, private_key)
+        except ValueError as e:
+            raise ValueError(f"Сліпий бюлетень {first_index + offset + 1}: не вдалося розшифрувати ({e})") from e
+        signatures.append(crt_sign(blinded_ballot, crt_params))
+    return signatures
+
+
+def _open_vote(private_key_der: bytes, encrypted_ballot: bytes, encrypted_signature: bytes, aes_key: bytes):
+    """Розшифровує бюлетень і підпис, помилку повертає замість винятку"""
+    private_key = _load_private_key(private_key_der)
+    try:
+        ballot = rsa_decrypt(encrypted_ballot, private_key)
+        signature = hybrid_decrypt(encrypted_signature, aes_key, private_key)
+        return ballot, signature
+    except ValueError as e:
+        return e
 
 
 class Commission:
-    def __init__(self, voters_tax_numbers: list[str], candidates_names: list[str]):
+    def __init__(self, voters_tax_numbers, candidates_names: list[str], executor=None, journal=None, keys=None,
+                 ballot_boxes=DEFAULT_BALLOT_BOXES, audit_rate=DEFAULT_AUDIT_RATE, bulletin_board=None,
+                 workers=None):
         """
         Ініціалізація комісії. Включає генерацію ключів для зв'язку та підпису.
+
+        :param voters_tax_numbers: Хеші ІПН виборців або готовий VoterRegistry.
+
+        :param executor: Необов'язковий пул потоків чи процесів (create_executor) для розшифрування,
+                         перевірки і підпису бюлетенів.
+        :param journal: Необов'язковий журнал (journal.Journal). Якщо передано, стан відновлюється
+                        з нього при старті, а кожна реєстрація і зарахований голос записуються в нього.
+        :param keys: Збережені ключі (приватний ключ зв'язку, ключ підпису), див. key_store.
+                     Якщо не передано, ключі генеруються.
+        :param ballot_boxes: Скільки скриньок має бути в наборі виборця.
+        :param audit_rate: Частка скриньок, які комісія відкриває при реєстрації (від 0 до 1).
+                           Скриньки обираються навмання після отримання набору. Чим менша частка,
+                           тим швидша реєстрація, але тим імовірніше пропустити підроблену
+                           скриньку, див. audit_escape_probability. При 1.0 відкриваються всі.
+        :param bulletin_board: Необов'язкова дошка оголошень (bulletin_board.BulletinBoard), в яку
+                               дописується кожен зарахований голос.
+        :param workers: Кількість робітників executor (None - за кількістю ядер), на стільки
+                        частин ділиться пакет сліпих бюлетенів.
         """
-        self.private_comm_key, self.public_comm_key = generate_rsa_keys()
-        self.voters_data = pd.DataFrame({
-            'tax_number': voters_tax_numbers,
-            'is_registered': np.zeros(len(voters_tax_numbers))
-        })
-        self.voters_data = self.voters_data.set_index('tax_number')
-        self.candidates_data = pd.DataFrame({
-            'Name': candidates_names,
-            'Votes_Count': np.zeros(len(candidates_names))
-        })
-        self.received_ballots = {}
-
-    def check_ballots_identity(self, current_ballot):
-        # Розбиваємо бюлетені на компоненти
-        current_ballot_parts = current_ballot.split('|')
+        if ballot_boxes < 1:
+            raise ValueError("Потрібна хоча б одна скринька")
+        if not 0 < audit_rate <= 1:
+            raise ValueError("Частка перевірки має бути в межах (0, 1]")
+        self.ballot_boxes = ballot_boxes
+        self.audit_rate = audit_rate
+
+        if keys is not None:
+            self.private_comm_key, sign_key = keys
+            self.public_comm_key = self.private_comm_key.public_key()
+        else:
+            self.private_comm_key, self.public_comm_key = generate_rsa_keys()
+            sign_key = None
+        self._private_key_der = self.private_comm_key.private_bytes(
+            serialization.Encoding.DER,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        )
+        # Довготривалий ключ підпису комісії, виборці отримують лише його публічну частину
+        self.bs = BlindSignature(key=sign_key)
+        self.public_sign_key = self.bs.public_key
+        self.executor = executor
+        self.workers = workers
+        # Реєстр хешів ІПН з позначками про реєстрацію
+        if isinstance(voters_tax_numbers, VoterRegistry):
+            self.voters_registry = voters_tax_numbers
+        else:
+            self.voters_registry = VoterRegistry(voters_tax_numbers)
+        # Лічильник голосів, таблиця pandas будується лише в get_results
+        self.tally = VoteTally(candidates_names)
+        # Множина 16-байтних ID зарахованих бюлетенів
+        self.received_ballots = set()
+        self.bulletin_board = bulletin_board
+        # Зараховані голоси, які ще чекають fsync журналу перед публікацією на дошці
+        self._unposted_votes = {}
+
+        # Зміни стану і записи в журнал робляться під цим замком
+        self._state_lock = threading.Lock()
+        self.journal = journal
+        if journal is not None:
+            # Реєстрації зберігаються за позиціями в реєстрі, тож журнал чужого реєстру відтворювати не можна
+            journal.bind(self.voters_registry.checksum())
+            self._recover()
+            journal.open()
 
+    def _recover(self):
+        """Відновлення стану зі знімка і журналу"""
+        snapshot = self.journal.load_snapshot()
+        if snapshot is not None:
+            self._restore_state(snapshot)
+
+        for record in self.journal.replay():
+            event = decode_record(record)
+            if event[0] == RECORD_REGISTRATION:
+                self.voters_registry.mark_registered(event[1])
+            else:
+                _, ballot_id, number = event
+                # Дошка могла відстати від журналу, дописування за тим самим ID не повторюється
+                if self.bulletin_board is not None:
+                    self.bulletin_board.append(ballot_id, record)
+                if ballot_id not in self.received_ballots:
+                    self.received_ballots.add(ballot_id)
+                    if number is not None:
+                        self.tally.add(number)
+
+    def _snapshot_state(self) -> bytes:
+        """Компактний знімок стану для журналу"""
+        bits = self.voters_registry.registration_bits()
+        counts = self.tally.counts.astype('<i8').tobytes()
+        ids = b''.join(bytes([len(ballot_id)]) + ballot_id for ballot_id in self.received_ballots)
+        body = bits + counts + ids
+        header = _SNAPSHOT_HEADER.pack(zlib.crc32(body), len(bits), len(counts), len(self.received_ballots),
+                                       self.voters_registry.checksum())
+        return _SNAPSHOT_MAGIC + header + body
+
+    def _restore_state(self, snapshot: bytes):
+        """Відновлення стану зі знімка"""
+        if not snapshot.startswith(_SNAPSHOT_MAGIC):
+            raise ValueError("Невідомий формат знімка")
+        checksum, bits_size, counts_size, num_ids, register_checksum = _SNAPSHOT_HEADER.unpack_from(
+            snapshot, len(_SNAPSHOT_MAGIC))
+        body = memoryview(snapshot)[len(_SNAPSHOT_MAGIC) + _SNAPSHOT_HEADER.size:]
+        if zlib.crc32(body) != checksum:
+            raise ValueError("Знімок пошкоджено")
+        if register_checksum != self.voters_registry.checksum():
+            raise ValueError("Знімок належить іншому реєстру виборців")
+
+        self.voters_registry.restore_registration_bits(bytes(body[:bits_size]))
+        counts = np.frombuffer(body[bits_size:bits_size + counts_size], dtype='<i8')
+        if len(counts) != len(self.tally):
+            raise ValueError("Знімок не відповідає списку кандидатів")
+        self.tally.counts[:] = counts
+
+        offset = bits_size + counts_size
+        self.received_ballots = set()
+        for _ in range(num_ids):
+            length = body[offset]
+            self.received_ballots.add(bytes(body[offset + 1:offset + 1 + length]))
+            offset += 1 + length
+
+    def _journal_append(self, record: bytes):
+        """Додає запис у журнал, викликається під self._state_lock"""
+        if self.journal is None:
+            return None
+        return self.journal.append(record)
+
+    def _wait_durable(self, commit_group, votes=()):
+        """
+        Чекає групового fsync поза замком, публікує голоси на дошці і за потреби знімає стан.
+
+        :param votes: Пари (ID бюлетеня, запис) з _accept_vote, що входять у commit_group.
+        """
+        if commit_group is None:
+            return
+        try:
+            commit_group.wait()
+        except Exception:
+            # Голоси не потрапили в журнал, тож і на дошці їх бути не може
+            with self._state_lock:
+                for ballot_id, _ in votes:
+                    self._unposted_votes.pop(ballot_id, None)
+            raise
+        self._post_votes(votes)
+        if not self.journal.needs_snapshot():
+            return
+        # Під замком лише знімаємо стан разом з точкою в журналі, запис іде без замка
+        with self._state_lock:
+            cut = self.journal.begin_snapshot()
+            if cut is None:
+                return
+            state = self._snapshot_state()
+            unposted = list(self._unposted_votes.items())
+        # Голоси зі знімка більше не відтворюються, тому дошка має бути на диску раніше.
+        # Голоси до точки знімка публікуються лише після їх fsync
+        if self.bulletin_board is not None:
+            self.journal.flush()
+            self._post_votes(unposted)
+            self.bulletin_board.flush()
+        self.journal.write_snapshot(state, cut)
+
+    def _post_votes(self, votes):
+        """Публікує на дошці голоси, які вже надійно записані в журнал"""
+        if self.bulletin_board is None or not votes:
+            return
+        # Дописування за тим самим ID не повторюється, тож голос може опублікувати і знімок
+        for ballot_id, record in votes:
+            self.bulletin_board.append(ballot_id, record)
+        with self._state_lock:
+            for ballot_id, _ in votes:
+                self._unposted_votes.pop(ballot_id, None)
+
+    def check_ballots_identity(self, current_ballot) -> int:
+        """Перевіряє бюлетень і повертає позицію виборця в реєстрі"""
+        return self._check_voter(_parse_ballot(current_ballot, len(self.tally)))
+
+    def _check_voter(self, voter_id) -> int:
+        """Перевіряє виборця за реєстром і повертає його позицію"""
         # Перевірка чи зареєстрований цей виборець в списках
-        if current_ballot_parts[1] not in self.voters_data.index.tolist():
+        voter_index = self.voters_registry.index_of(voter_id)
+        if voter_index < 0:
             raise ValueError("Виборця з таким ID не існує")
 
         # Перевірка чи не голосував виборець раніше
-        if self.voters_data.loc[current_ballot_parts[1], 'is_registered'] != 0:
+        if self.voters_registry.is_registered(voter_index):
             raise ValueError("Виборець за таким ID вже зареєстрований")
 
-        # Перевірка коректності вибору кандидата
-        voter_choice = int(current_ballot_parts[2])
-        if voter_choice < 1 or voter_choice > len(self.candidates_data):
-            raise ValueError("Неправильний вибір кандидата")
+        return voter_index
 
-        # Перевірка формату бюлетеня
-        if len(current_ballot_parts) != 3:
-            raise ValueError("Бюлетень складений некоректно")
+    def _submit_each(self, func, args_list) -> list:
+        """Запускає func для кожного набору аргументів, повертає функції очікування результату"""
+        if self.executor is None:
+            return [lambda args=args: func(*args) for args in args_list]
+        return [self.executor.submit(func, *args).result for args in args_list]
 
-    def register_ballot(self, ballot_kit: list[list[dict]], blind_ballots: list[bytes], bs: BlindSignature) -> list[tuple[bytes, int]]:
+    def choose_audited_boxes(self) -> list[int]:
+        """Номери скриньок для перевірки (з нуля), обрані навмання за audit_rate"""
+        audited = audited_boxes_count(self.ballot_boxes, self.audit_rate)
+        if audited == self.ballot_boxes:
+            return list(range(self.ballot_boxes))
+        return sorted(_audit_random.sample(range(self.ballot_boxes), audited))
+
+    @timed('verify_ballot_kit')
+    def verify_ballot_kit(self, ballot_kit: list[tuple[bytes, bytes]]) -> int:
+        """
+        Розшифровує і перевіряє обрані для перевірки скриньки набору.
+
+        :param ballot_kit: Набір скриньок, кожна у вигляді гібридного конверту (шифротекст, зашифрований aes ключ).
+        :return: Позиція виборця в реєстрі.
+        """
+        if not ballot_kit:
+            raise ValueError("Набір бюлетенів порожній")
+        if len(ballot_kit) != self.ballot_boxes:
+            raise ValueError(f"Набір містить {len(ballot_kit)} скриньок, очікується {self.ballot_boxes}")
+
+        # Розшифрування і перевірка формату обраних скриньок паралельно, решта не відкривається
+        audited = self.choose_audited_boxes()
+        futures = self._submit_each(
+            _open_ballot_box,
+            [(self._private_key_der, *ballot_kit[box_index], len(self.tally)) for box_index in audited]
+        )
+
+        # Перевірка за реєстром у порядку скриньок, щоб помилка завжди вказувала на першу з них
+        curr_voter_index = -1
+        for box_index, future in zip(audited, futures):
+            try:
+                voter_ids = future()
+            except ValueError as e:
+                raise ValueError(f"Скринька {box_index + 1}, {e}") from e
+
+            for ballot_index, voter_id in enumerate(voter_ids):
+                try:
+                    curr_voter_index = self._check_voter(voter_id)
+                except ValueError as e:
+                    raise ValueError(f"Скринька {box_index + 1}, бюлетень {ballot_index + 1}: {e}") from e
+
+        return curr_voter_index
+
+    @timed('register_ballot')
+    def register_ballot(self, ballot_kit: list[tuple[bytes, bytes]], blind_ballots: list[bytes]) -> list[tuple[bytes, int]]:
         """
         Перевірка бюлетенів та створення сліпих підписів для голосування.
 
-        :param bs: Потрібен для роботи з сліпими підписами.
-        :param ballot_kit: Набір зашифрованих бюлетенів.
+        :param ballot_kit: Набір скриньок, кожна у вигляді гібридного конверту (шифротекст, зашифрований aes ключ).
         :param blind_ballots: Список засліплених бюлетенів.
         :return: Список сліпих підписів.
         """
-        blind_signatures = []
-        curr_voter_id = 0
-
-        # Перевірка ідентичності бюлетенів
-        for ballot_box in ballot_kit:
-            for ballot in ballot_box:
-                # Розшифровуємо поточний бюлетень
-                ballot_id = rsa_decrypt(ballot['ballot_id'], self.private_comm_key)
-                voter_id = rsa_decrypt(ballot['voter_id'], self.private_comm_key)
-                voter_choice = rsa_decrypt(ballot['voter_choice'], self.private_comm_key)
-                current_ballot = f"{ballot_id}|{voter_id}|{voter_choice}"
-
-                # Перевіряємо ідентичність
-                self.check_ballots_identity(current_ballot)
-                curr_voter_id = voter_id
+        curr_voter_index = self.verify_ballot_kit(ballot_kit)
 
         # Створення сліпих підписів
-        for hidden_ballot, encrypted_aes_key in blind_ballots:
-            # Розшифровуємо прихований бюлетень
-            decrypted_hidden_ballot = hybrid_decrypt(hidden_ballot, encrypted_aes_key, self.private_comm_key)
-
-            # Створюємо підпис
-            signature = bs.sign_blinded_message(decrypted_hidden_ballot)
-            blind_signatures.append(signature)
+        blind_signatures = self.sign_blind_ballots(blind_ballots)
 
         # Якщо перевірку пройдено, то вважаємо що цей виброець проголосував
-        self.voters_data.loc[curr_voter_id, 'is_registered'] += 1
+        with self._state_lock:
+            # Паралельна реєстрація того ж виборця могла завершитися раніше
+            if self.voters_registry.is_registered(curr_voter_index):
+                raise ValueError("Виборець за таким ID вже зареєстрований")
+            self.voters_registry.mark_registered(curr_voter_index)
+            commit_group = self._journal_append(encode_registration(curr_voter_index))
+        self._wait_durable(commit_group)
+        increment('registrations')
 
         return blind_signatures
 
-
-    def count_vote(self, encrypted_ballot: bytes, encrypted_signature: bytes, aes_key: bytes, bs: BlindSignature):
+    @timed('sign_blind_ballots')
+    def sign_blind_ballots(self, blind_ballots: list[tuple[bytes, bytes]]) -> list[bytes]:
         """
-        Обробка зашифрованого голосу та підрахунок голосу для відповідного кандидата.
+        Розшифровує приховані бюлетені і підписує їх. З пулом пакет ділиться на
+        частини за кількістю робітників, кожна частина розшифровується і
+        підписується одним завданням (підпис - основна частина реєстрації).
 
-        :param bs:
-        :param encrypted_ballot: Зашифрований бюлетень.
-        :param encrypted_signature: Зашифрований підпис бюлетеня.
-        :param aes_key: Зашифрований aes ключ підпису бюлетеня.
+        :param blind_ballots: Список засліплених бюлетенів у гібридних конвертах.
+        :return: Список сліпих підписів.
         """
-        # Розшифровуємо повідомлення
-        ballot = rsa_decrypt(encrypted_ballot, self.private_comm_key)
-        signature = hybrid_decrypt(encrypted_signature, aes_key, self.private_comm_key)
+        blind_ballots = list(blind_ballots)
+        if self.executor is None:
+            return _open_and_sign_blind_ballots(self._private_key_der, self.bs.crt_params, 0, blind_ballots)
 
-        # Перевірка підпису
-        is_valid = bs.verify(ballot.encode('utf-8'), signature)
+        workers = self.workers or os.cpu_count() or 1
+        chunk_size = max(1, -(-len(blind_ballots) // workers))
+        futures = [
+            self.executor.submit(_open_and_sign_blind_ballots, self._private_key_der, self.bs.crt_params,
+                                 start, blind_ballots[start:start + chunk_size])
+            for start in range(0, len(blind_ballots), chunk_size)
+        ]
 
-        if not is_valid:
-            raise ValueError("Відісланий підпис не пройшов перевірку")
+        # Помилка першої за порядком частини, щоб повідомлення вказувало на перший зіпсований бюлетень
+        signatures = []
+        for future in futures:
+            signatures.extend(future.result())
+        return signatures
 
+    def _accept_vote(self, ballot: str):
+        """
+        Перевіряє унікальність бюлетеня, запам'ятовує його ID і записує подію в журнал.
+        Викликається під self._state_lock.
+
+        Голос публікується на дошці одразу лише без журналу, інакше після fsync (_wait_durable).
+
+        :return: (номер кандидата для зарахування або None, якщо вибір не є числом; група журналу;
+                  пара (ID бюлетеня, запис) для _wait_durable).
+        """
         # Аналіз бюлетеня
         data = ballot.split('|')
+        if len(data) != 3:
+            raise ValueError("Бюлетень складений некоректно")
 
         # Отримання id бюлетеня і перевірка чи є такий виборець
-        ballot_id = data[0]
-        if ballot_id in self.received_ballots.keys():
+        ballot_id = ballot_id_to_bytes(data[0])
+        # Перевіряється до зміни стану: такий ID не влізе в запис журналу і знімок
+        if len(ballot_id) > MAX_BALLOT_ID_SIZE:
+            raise ValueError("Ідентифікатор бюлетеня задовгий")
+        if ballot_id in self.received_ballots:
             raise ValueError("Бюлетень з таким ID вже зарахований")
-        else:
-            self.received_ballots.update({f'{ballot_id}': ballot})
 
-        # Отримання голосу виборця, перевірка чи є такий кандидат і зарахування голосу якщо є
+        # Отримання голосу виборця і перевірка чи є такий кандидат
         candidate_number = data[2]
+        number = None
         if candidate_number.isdigit():
             number = int(candidate_number)
+            if not 1 <= number <= len(self.tally):
+                raise ValueError(f"Кандидата під номером {number} не існує")
 
-            if 1 <= number <= len(self.candidates_data):
-                self.candidates_data.loc[number - 1, 'Votes_Count'] += 1
+        self.received_ballots.add(ballot_id)
+        record = encode_vote(ballot_id, number)
+        commit_group = self._journal_append(record)
+        if self.bulletin_board is not None:
+            if commit_group is None:
+                self.bulletin_board.append(ballot_id, record)
             else:
-                raise ValueError(f"Кандидата під номером {number} не існує")
+                self._unposted_votes[ballot_id] = record
+        return number, commit_group, (ballot_id, record)
+
+    def open_vote(self, encrypted_ballot: bytes, encrypted_signature: bytes, aes_key: bytes) -> str:
+        """
+        Розшифровує бюлетень і перевіряє підпис, не зараховуючи голос.
+
+        :return: Текст бюлетеня.
+        """
+        # Розшифровуємо повідомлення
+        ballot = rsa_decrypt(encrypted_ballot, self.private_comm_key)
+        signature = hybrid_decrypt(encrypted_signature, aes_key, self.private_comm_key)
+
+        # Перевірка підпису
+        is_valid = self.bs.verify(ballot.encode('utf-8'), signature)
+
+        if not is_valid:
+            raise ValueError("Відісланий підпис не пройшов перевірку")
+
+        return ballot
+
+    def record_vote(self, ballot: str):
+        """Зараховує голос з уже перевіреного бюлетеня"""
+        with self._state_lock:
+            number, commit_group, vote = self._accept_vote(ballot)
+            if number is not None:
+                self.tally.add(number)
+        self._wait_durable(commit_group, [vote])
+        increment('votes_counted')
+
+    @timed('count_vote')
+    def count_vote(self, encrypted_ballot: bytes, encrypted_signature: bytes, aes_key: bytes):
+        """
+        Обробка зашифрованого голосу та підрахунок голосу для відповідного кандидата.
+
+        :param encrypted_ballot: Зашифрований бюлетень.
+        :param encrypted_signature: Зашифрований підпис бюлетеня.
+        :param aes_key: Зашифрований aes ключ підпису бюлетеня.
+        """
+        self.record_vote(self.open_vote(encrypted_ballot, encrypted_signature, aes_key))
+
+    def open_votes_batch(self, envelopes: list[tuple[bytes, bytes, bytes]], workers=None) -> list[tuple[str | None, str | None]]:
+        """
+        Пакетне розшифрування і перевірка підписів без зарахування голосів.
+
+        :param envelopes: Список кортежів (зашифрований бюлетень, зашифрований підпис, зашифрований aes ключ).
+        :param workers: Кількість потоків для розшифрування, якщо в комісії немає власного пулу.
+        :return: Список (текст бюлетеня, текст помилки) у порядку конвертів.
+        """
+        opened_ballots = [(None, None)] * len(envelopes)
+
+        # Розшифровуємо конверти паралельно, RSA в cryptography відпускає GIL
+        executor = self.executor or ThreadPoolExecutor(max_workers=workers)
+        try:
+            opened = list(executor.map(
+                _open_vote,
+                [self._private_key_der] * len(envelopes),
+                *zip(*envelopes)
+            )) if envelopes else []
+        finally:
+            if executor is not self.executor:
+                executor.shutdown()
+
+        decrypted = []
+        for i, item in enumerate(opened):
+            if isinstance(item, Exception):
+                opened_ballots[i] = (None, f"Не вдалося розшифрувати бюлетень: {item}")
+            else:
+                decrypted.append((i, item[0], item[1]))
+
+        # Пакетна перевірка підписів
+        verified = self.bs.verify_batch(
+            [ballot.encode('utf-8') for _, ballot, _ in decrypted],
+            [signature for _, _, signature in decrypted]
+        )
+
+        for (i, ballot, _), is_valid in zip(decrypted, verified):
+            if is_valid:
+                opened_ballots[i] = (ballot, None)
+            else:
+                opened_ballots[i] = (None, "Відісланий підпис не пройшов перевірку")
+
+        return opened_ballots
+
+    def record_votes(self, ballots: list[str]) -> list[tuple[bool, str | None]]:
+        """
+        Зараховує пакет перевірених бюлетенів.
+
+        :return: Список (чи зараховано голос, текст помилки) у порядку бюлетенів.
+        """
+        results = []
+
+        # Перевірка унікальності у порядку надходження, голоси зараховуються одним пакетом
+        accepted_numbers = []
+        accepted_votes = []
+        commit_group = None
+        with self._state_lock:
+            for ballot in ballots:
+                try:
+                    number, group, vote = self._accept_vote(ballot)
+                    commit_group = group or commit_group
+                    accepted_votes.append(vote)
+                    if number is not None:
+                        accepted_numbers.append(number)
+                    results.append((True, None))
+                except ValueError as e:
+                    results.append((False, str(e)))
+
+            self.tally.add_many(accepted_numbers)
+
+        # Усі записи пакета потрапляють в одну або кілька послідовних груп, достатньо дочекатися останньої
+        self._wait_durable(commit_group, accepted_votes)
+        counted = sum(ok for ok, _ in results)
+        increment('votes_counted', counted)
+        increment('votes_rejected', len(results) - counted)
+
+        return results
+
+    @timed('count_votes_batch')
+    def count_votes_batch(self, envelopes: list[tuple[bytes, bytes, bytes]], workers=None) -> list[tuple[bool, str | None]]:
+        """
+        Пакетний підрахунок голосів. На відміну від count_vote не зупиняється на першій
+        помилці, а повертає результат для кожного бюлетеня.
+
+        :param envelopes: Список кортежів (зашифрований бюлетень, зашифрований підпис, зашифрований aes ключ).
+        :param workers: Кількість потоків для розшифрування, якщо в комісії немає власного пулу.
+        :return: Список (чи зараховано голос, текст помилки) у порядку конвертів.
+        """
+        opened = self.open_votes_batch(envelopes, workers)
+        results = [(False, error) for _, error in opened]
+
+        valid = [(i, ballot) for i, (ballot, _) in enumerate(opened) if ballot is not None]
+        recorded = self.record_votes([ballot for _, ballot in valid])
+        for (i, _), result in zip(valid, recorded):
+            results[i] = result
+
+        return results
+
+    def bulletin_root(self) -> dict:
+        """Підписаний корінь дошки оголошень, див. BulletinBoard.signed_root"""
+        if self.bulletin_board is None:
+            raise ValueError("Дошку оголошень не підключено")
+        return self.bulletin_board.signed_root(self.private_comm_key)
+
+    def inclusion_proof(self, ballot_id: str) -> dict:
+        """
+        Доказ того, що бюлетень зараховано, відносно підписаного кореня дошки.
+
+        :param ballot_id: ID бюлетеня (hex).
+        :return: {'index', 'leaf', 'proof', 'root'}, перевіряється bulletin_board.verify_inclusion
+                 і verify_signed_root з публічним ключем зв'язку комісії.
+        """
+        if self.bulletin_board is None:
+            raise ValueError("Дошку оголошень не підключено")
+        index = self.bulletin_board.index_of(ballot_id_to_bytes(ballot_id))
+        if index < 0:
+            raise ValueError("Бюлетень з таким ID не зараховано")
+        root = self.bulletin_root()
+        return {
+            'index': index,
+            'leaf': self.bulletin_board.leaf(index),
+            'proof': self.bulletin_board.inclusion_proof(index, root['tree_size']),
+            'root': root,
+        }
+
+    def tally_snapshot(self) -> dict:
+        """
+        Поточні підсумки для живих результатів (live_results). Береться без замка стану:
+        лічильник копіюється одним викликом numpy, тому знімок узгоджений за кандидатами,
+        але може відставати від кількості зарахованих бюлетенів на голоси в обробці.
+        """
+        return {
+            'names': self.tally.candidates_names,
+            'counts': self.tally.counts.copy(),
+            'counted': len(self.received_ballots),
+            'registered': self.voters_registry.registered_count,
+            'register_size': len(self.voters_registry),
+        }
 
     def get_results(self):
         """Передає результати голосування"""
         num_of_voted = len(self.received_ballots)
-        return self.candidates_data, num_of_voted, self.received_ballots
+        return self.tally.to_frame(), num_of_voted, self.received_ballots
 
@@ -0,0 +1,41 @@
+"""
+Допоміжні функції для генерації бюлетенів.
+"""
+
+import secrets
+
+BALLOT_ID_SIZE = 16
+
+
+def new_ballot_id() -> str:
+    """
+    Новий випадковий 128-бітний ідентифікатор бюлетеня у шістнадцятковому вигляді.
+
+    ID мають бути незалежними: бюлетені для перевірки містять ID виборця, і
+    послідовні ID дозволили б зв'язати зарахований голос з виборцем.
+    """
+    return secrets.token_bytes(BALLOT_ID_SIZE).hex()
+
+
+def ballot_id_to_bytes(ballot_id: str) -> bytes:
+    """Компактне представлення ID бюлетеня для зберігання в множині"""
+    if len(ballot_id) == 2 * BALLOT_ID_SIZE:
+        try:
+            return bytes.fromhex(ballot_id)
+        except ValueError:
+            pass
+    return ballot_id.encode('utf-8')
+
+
+def generate_ballot_text(candidate_number, voter_id, candidates):
+    """
+    Текст бюлетеня для перевірки комісією.
+
+    :param candidate_number: Номер кандидата, починаючи з 1.
+    :param voter_id: Хеш ІПН виборця.
+    :param candidates: Список кандидатів.
+    """
+    return (f"Ідентифікатор бюлетеня: {new_ballot_id()}\n"
+            f"Ідентифікатор виборця: {voter_id}\n"
+            f"Кандидат: {candidates[candidate_number - 1]}\n"
+            f"Ваш вибір: {candidate_number}")
@@ -5,9 +5,14 @@ from cryptography.hazmat.primitives.asymmetric import padding as asymmetric_padd
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.primitives import padding as symmetric_padding
 
+from instrumentation import timed
+
+# Розмір ключів зв'язку (виборців і комісії), див. benchmarks/bench_primitives.py
+DEFAULT_KEY_SIZE = 1024
+
 
 # Генерація пари ключів RSA
-def generate_rsa_keys(key_size=1024):
+def generate_rsa_keys(key_size=DEFAULT_KEY_SIZE):
     private_key = rsa.generate_private_key(
         public_exponent=65537,
         key_size=key_size,
@@ -17,6 +22,7 @@ def generate_rsa_keys(key_size=1024):
     return private_key, public_key
 
 
+@timed('rsa_encrypt')
 def rsa_encrypt(message, public_key):
     """
     Шифрує повідомлення за допомогою публічного ключа RSA з компактними налаштуваннями.
@@ -29,16 +35,14 @@ def rsa_encrypt(message, public_key):
     if isinstance(message, str):
         message = message.encode('utf-8')
 
-    try:
-        encrypted_message = public_key.encrypt(
-            message,
-            asymmetric_padding.PKCS1v15()  # Компактніший padding
-        )
-        return encrypted_message
-    except Exception as e:
-        print(f"Помилка шифрування: {e}")
-        raise
+    encrypted_message = public_key.encrypt(
+        message,
+        asymmetric_padding.PKCS1v15()  # Компактніший padding
+    )
+    return encrypted_message
 
+
+@timed('rsa_decrypt')
 def rsa_decrypt(encrypted_message, private_key):
     """
     Розшифровує повідомлення за допомогою приватного ключа RSA з компактними налаштуваннями.
@@ -47,18 +51,15 @@ def rsa_decrypt(encrypted_message, private_key):
     :param private_key: Об'єкт приватного ключа RSA.
     :return: Розшифроване повідомлення у вигляді рядка.
     """
-    try:
-        decrypted_message = private_key.decrypt(
-            encrypted_message,
-            asymmetric_padding.PKCS1v15()  # Відповідний padding для розшифрування
-        )
-        return decrypted_message.decode('utf-8')
-    except Exception as e:
-        print(f"Помилка дешифрування: {e}")
-        raise
+    decrypted_message = private_key.decrypt(
+        encrypted_message,
+        asymmetric_padding.PKCS1v15()  # Відповідний padding для розшифрування
+    )
+    return decrypted_message.decode('utf-8')
 
 
 # Гібридне дешифрування підпису
+@timed('hybrid_decrypt')
 def hybrid_decrypt(encrypted_signature, encrypted_aes_key, private_key):
     # Розшифрування AES-ключа
     decrypted_key_iv = private_key.decrypt(
@@ -81,6 +82,7 @@ def hybrid_decrypt(encrypted_signature, encrypted_aes_key, private_key):
 
 
 # Гібридне шифрування підпису
+@timed('hybrid_encrypt')
 def hybrid_encrypt(signature, public_key):
     # Перевірка типу та конвертація, якщо потрібно
     if not isinstance(signature, bytes):
@@ -0,0 +1,263 @@
+"""
+Інструментування гарячого шляху: лічильники операцій, гістограми затримок
+і профілювання (cProfile або вибірковий профайлер для всіх потоків).
+
+За замовчуванням вимкнено: обгортка timed тоді лише перевіряє один прапорець
+і викликає функцію. Вмикається під час роботи через enable() або змінною
+оточення VOTING_METRICS=1. Метрики збираються в поточному процесі, робітники
+пулу процесів їх не передають.
+
+Приклад:
+    import instrumentation
+    instrumentation.enable()
+    ...
+    print(instrumentation.export_prometheus())
+"""
+
+import bisect
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+# Верхні межі кошиків гістограми в секундах, останній кошик - +Inf
+BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+           1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = os.environ.get('VOTING_METRICS', '') not in ('', '0')
+_lock = threading.Lock()
+_operations = {}
+_counters = Counter()
+_profiler = None
+
+
+class _Histogram:
+    __slots__ = ('count', 'total', 'errors', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds: float, failed: bool):
+        self.count += 1
+        self.total += seconds
+        self.errors += failed
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Оцінка квантиля за верхньою межею кошика"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bound, in_bucket in zip(BUCKETS + (float('inf'),), self.buckets):
+            cumulative += in_bucket
+            if cumulative >= rank:
+                return bound
+        return float('inf')
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Очищає всі зібрані метрики"""
+    with _lock:
+        _operations.clear()
+        _counters.clear()
+
+
+def observe(name: str, seconds: float, failed=False):
+    """Записує тривалість однієї операції"""
+    if not _enabled:
+        return
+    with _lock:
+        histogram = _operations.get(name)
+        if histogram is None:
+            histogram = _operations[name] = _Histogram()
+        histogram.observe(seconds, failed)
+
+
+def increment(name: str, value=1):
+    """Збільшує лічильник подій"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] += value
+
+
+def timed(name: str):
+    """Декоратор: кількість викликів, помилки і гістограма затримок операції name"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                observe(name, time.perf_counter() - start, failed)
+
+        return wrapper
+
+    return decorator
+
+
+# ----------------------- Експорт -----------------------
+
+def export_json() -> dict:
+    """Знімок метрик у вигляді словника, придатного для json.dump"""
+    with _lock:
+        operations = {
+            name: {
+                'count': histogram.count,
+                'errors': histogram.errors,
+                'sum_s': histogram.total,
+                'mean_ms': histogram.total / histogram.count * 1e3 if histogram.count else 0.0,
+                'p50_ms': histogram.quantile(0.5) * 1e3,
+                'p90_ms': histogram.quantile(0.9) * 1e3,
+                'p99_ms': histogram.quantile(0.99) * 1e3,
+                'buckets': dict(zip([str(bound) for bound in BUCKETS] + ['+Inf'], histogram.buckets)),
+            }
+            for name, histogram in sorted(_operations.items())
+        }
+        counters = dict(sorted(_counters.items()))
+    return {'enabled': _enabled, 'operations': operations, 'counters': counters}
+
+
+def export_prometheus(prefix='voting') -> str:
+    """Метрики в текстовому форматі Prometheus"""
+    with _lock:
+        operations = [(name, histogram.count, histogram.total, histogram.errors, list(histogram.buckets))
+                      for name, histogram in sorted(_operations.items())]
+        counters = sorted(_counters.items())
+
+    metric = f'{prefix}_operation_seconds'
+    lines = [f'# HELP {metric} Тривалість операцій.', f'# TYPE {metric} histogram']
+    for name, count, total, _, buckets in operations:
+        cumulative = 0
+        for bound, in_bucket in zip(BUCKETS, buckets):
+            cumulative += in_bucket
+            lines.append(f'{metric}_bucket{{op="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{op="{name}",le="+Inf"}} {count}')
+        lines.append(f'{metric}_sum{{op="{name}"}} {total}')
+        lines.append(f'{metric}_count{{op="{name}"}} {count}')
+
+    metric = f'{prefix}_operation_errors_total'
+    lines += [f'# HELP {metric} Операції, що завершилися винятком.', f'# TYPE {metric} counter']
+    lines += [f'{metric}{{op="{name}"}} {errors}' for name, _, _, errors, _ in operations]
+
+    for name, value in counters:
+        metric = f'{prefix}_{name}_total'
+        lines += [f'# TYPE {metric} counter', f'{metric} {value}']
+
+    return '\n'.join(lines) + '\n'
+
+
+# ----------------------- Профілювання -----------------------
+
+def start_profiling():
+    """Запускає cProfile для поточного потоку"""
+    global _profiler
+    if _profiler is not None:
+        raise ValueError("Профілювання вже запущено")
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+
+
+def stop_profiling(sort='cumulative', limit=30) -> str:
+    """Зупиняє cProfile і повертає звіт pstats"""
+    global _profiler
+    if _profiler is None:
+        raise ValueError("Профілювання не запущено")
+    _profiler.disable()
+    output = io.StringIO()
+    pstats.Stats(_profiler, stream=output).sort_stats(sort).print_stats(limit)
+    _profiler = None
+    return output.getvalue()
+
+
+class SamplingProfiler:
+    """
+    Вибірковий профайлер: фоновий потік раз на interval секунд знімає стеки
+    всіх потоків. Накладні витрати не залежать від кількості викликів, тому
+    його можна тримати увімкненим під навантаженням.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = 0
+        self._leaf = Counter()
+        self._inclusive = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self.samples += 1
+                self._leaf[_frame_name(frame)] += 1
+                seen = set()
+                while frame is not None:
+                    name = _frame_name(frame)
+                    if name not in seen:
+                        seen.add(name)
+                        self._inclusive[name] += 1
+                    frame = frame.f_back
+
+    def top(self, limit=20) -> list[dict]:
+        """Функції з найбільшою кількістю вибірок (власних і разом з викликаними)"""
+        return [
+            {'function': name, 'self': self._leaf[name], 'inclusive': count,
+             'share': count / self.samples if self.samples else 0.0}
+            for name, count in self._inclusive.most_common(limit)
+        ]
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
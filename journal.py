@@ -0,0 +1,340 @@
+"""
+Журнал подій комісії з попереднім записом (write-ahead log).
+
+Записи дописуються в кінець файлу journal.log у вигляді кадрів
+<u32 довжина><u32 crc32><дані>. Фоновий потік збирає записи за вікно
+group_commit_window і робить один fsync на всю групу. Періодичний знімок
+стану (snapshot.bin) замінює журнал, щоб відновлення не росло разом з ним.
+Журнал і знімок можна прив'язати до ідентичності (bind), наприклад до
+контрольної суми реєстру виборців: перший кадр журналу - заголовок з нею,
+і чужий журнал не відтворюється. Знімок прив'язаний до точки в журналі (snapshot_cut): власник знімає стан
+і точку під своїм замком, а запис знімка і стиснення журналу до записів
+після точки йдуть уже без нього. Відтворення журналу ідемпотентне, тому
+збій між записом знімка і стисненням журналу не псує стан.
+"""
+
+import os
+import struct
+import threading
+import time
+import zlib
+
+from atomic_file import write_atomic
+
+LOG_NAME = 'journal.log'
+SNAPSHOT_NAME = 'snapshot.bin'
+
+_FRAME_HEADER = struct.Struct('<II')
+
+RECORD_REGISTRATION = b'R'
+RECORD_VOTE = b'V'
+RECORD_HEADER = b'H'
+
+_REGISTRATION = struct.Struct('<cQ')
+_VOTE_HEADER = struct.Struct('<cIB')
+
+# Довжина ID бюлетеня зберігається одним байтом (у журналі і в знімку комісії)
+MAX_BALLOT_ID_SIZE = 255
+
+
+def _frame(record: bytes) -> bytes:
+    return _FRAME_HEADER.pack(len(record), zlib.crc32(record)) + record
+
+
+def encode_registration(voter_index: int) -> bytes:
+    """Запис про реєстрацію виборця за його позицією в реєстрі"""
+    return _REGISTRATION.pack(RECORD_REGISTRATION, voter_index)
+
+
+def encode_vote(ballot_id: bytes, candidate_number: int | None) -> bytes:
+    """Запис про зарахований бюлетень (0 - вибір не є числом)"""
+    if len(ballot_id) > MAX_BALLOT_ID_SIZE:
+        raise ValueError("Ідентифікатор бюлетеня задовгий")
+    return _VOTE_HEADER.pack(RECORD_VOTE, candidate_number or 0, len(ballot_id)) + ballot_id
+
+
+def decode_record(record: bytes) -> tuple:
+    """
+    :return: (RECORD_REGISTRATION, voter_index) або (RECORD_VOTE, ballot_id, candidate_number | None).
+    """
+    kind = record[:1]
+    if kind == RECORD_REGISTRATION:
+        return _REGISTRATION.unpack(record)
+    if kind == RECORD_VOTE:
+        _, candidate_number, id_length = _VOTE_HEADER.unpack_from(record)
+        ballot_id = record[_VOTE_HEADER.size:_VOTE_HEADER.size + id_length]
+        return RECORD_VOTE, ballot_id, candidate_number or None
+    raise ValueError(f"Невідомий тип запису журналу: {kind!r}")
+
+
+class _CommitGroup:
+    """Група записів, які стануть надійними одним fsync"""
+
+    def __init__(self):
+        self.frames = []
+        self.done = threading.Event()
+        self.error = None
+
+    def wait(self):
+        """Чекає, доки група буде записана на диск"""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+
+
+class Journal:
+    def __init__(self, directory: str, group_commit_window=0.002, snapshot_interval=100_000):
+        """
+        :param directory: Каталог для журналу і знімка.
+        :param group_commit_window: Скільки секунд збирати записи перед одним fsync.
+        :param snapshot_interval: Після скількох записів знімати стан (див. needs_snapshot).
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.group_commit_window = group_commit_window
+        self.snapshot_interval = snapshot_interval
+        self.log_path = os.path.join(directory, LOG_NAME)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_NAME)
+
+        self._lock = threading.Lock()
+        self._has_pending = threading.Condition(self._lock)
+        self._pending = _CommitGroup()
+        self._in_flight = None
+        self._closed = False
+        self.records_since_snapshot = 0
+        self.fsync_count = 0
+
+        # Запис у файл і стиснення журналу не перетинаються
+        self._write_lock = threading.Lock()
+        # Скільки байтів додано в журнал (разом із ще не записаними групами)
+        self._appended_bytes = 0
+        # Скільки байтів журналу вже цілими записано у файл, на цю межу файл обрізається після збою запису
+        self._written_bytes = 0
+        self._write_error = None
+        self._snapshot_cut = None
+        self.identity = None
+
+        self._file = None
+        self._flusher = None
+
+    # ----------------------- Відновлення -----------------------
+
+    def bind(self, identity: bytes):
+        """
+        Прив'язує журнал до ідентичності власника (до replay і open). Журнал
+        з іншою ідентичністю в заголовку не відтворюється.
+        """
+        if self.identity is not None and self.identity != identity:
+            raise ValueError("Журнал уже прив'язаний до іншої ідентичності")
+        self.identity = identity
+
+    def load_snapshot(self) -> bytes | None:
+        """Останній знімок стану або None"""
+        if not os.path.exists(self.snapshot_path):
+            return None
+        with open(self.snapshot_path, 'rb') as f:
+            return f.read()
+
+    def replay(self):
+        """
+        Повертає записи журналу по порядку. Обірваний або пошкоджений хвіст
+        (збій посеред запису) відкидається і обрізається з файлу.
+        """
+        if not os.path.exists(self.log_path):
+            return []
+
+        with open(self.log_path, 'rb') as f:
+            data = f.read()
+
+        records = []
+        offset = 0
+        while offset + _FRAME_HEADER.size <= len(data):
+            length, checksum = _FRAME_HEADER.unpack_from(data, offset)
+            start = offset + _FRAME_HEADER.size
+            record = data[start:start + length]
+            if len(record) != length or zlib.crc32(record) != checksum:
+                break
+            records.append(record)
+            offset = start + length
+
+        # Журнал, записаний до появи заголовків, перевірити неможливо
+        if records and records[0][:1] == RECORD_HEADER:
+            if self.identity is not None and records[0][1:] != self.identity:
+                raise ValueError("Журнал належить іншому реєстру виборців")
+            records = records[1:]
+
+        if offset != len(data):
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(offset)
+                f.flush()
+                os.fsync(f.fileno())
+
+        self.records_since_snapshot = len(records)
+        return records
+
+    # ----------------------- Запис -----------------------
+
+    def open(self):
+        """Відкриває журнал на дописування і запускає потік групового fsync"""
+        if self._file is not None:
+            return self
+        # Без буфера Python: після невдалого запису у файлі не лишається недописаних даних
+        self._file = open(self.log_path, 'ab', buffering=0)
+        if os.fstat(self._file.fileno()).st_size == 0 and self.identity is not None:
+            self._file.write(_frame(RECORD_HEADER + self.identity))
+            os.fsync(self._file.fileno())
+        self._written_bytes = self._appended_bytes = os.fstat(self._file.fileno()).st_size
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name='journal-flusher', daemon=True)
+        self._flusher.start()
+        return self
+
+    def append(self, record: bytes) -> _CommitGroup:
+        """
+        Додає запис до поточної групи. Повертає групу, на якій можна
+        викликати wait(), щоб дочекатися fsync.
+        """
+        frame = _frame(record)
+        with self._lock:
+            if self._file is None:
+                raise ValueError("Журнал не відкритий")
+            group = self._pending
+            group.frames.append(frame)
+            self._appended_bytes += len(frame)
+            self.records_since_snapshot += 1
+            self._has_pending.notify()
+        return group
+
+    def commit(self, record: bytes):
+        """Додає запис і чекає, доки він стане надійним"""
+        self.append(record).wait()
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                while not self._pending.frames and not self._closed:
+                    self._has_pending.wait()
+                if self._closed and not self._pending.frames:
+                    return
+
+            # Збираємо інші записи за вікно групового коміту
+            if self.group_commit_window > 0:
+                time.sleep(self.group_commit_window)
+
+            with self._lock:
+                group = self._pending
+                self._pending = _CommitGroup()
+                self._in_flight = group
+            self._write_group(group)
+
+    def _write_group(self, group: _CommitGroup):
+        data = b''.join(group.frames)
+        with self._write_lock:
+            if self._write_error is not None:
+                group.error = self._write_error
+                group.done.set()
+                return
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[self._file.write(view):]
+                os.fsync(self._file.fileno())
+                self._written_bytes += len(data)
+                self.fsync_count += 1
+            except OSError as e:
+                group.error = e
+                # Обірваний кадр сховав би від відтворення всі наступні групи, тому обрізаємо його
+                try:
+                    os.ftruncate(self._file.fileno(), self._written_bytes)
+                    os.fsync(self._file.fileno())
+                except OSError as truncate_error:
+                    # Далі писати не можна: нові групи лягли б після пошкодженого хвоста
+                    self._write_error = truncate_error
+            group.done.set()
+
+    def flush(self):
+        """Чекає запису всіх уже доданих записів"""
+        with self._lock:
+            groups = [self._in_flight, self._pending]
+        for group in groups:
+            if group is not None and group.frames:
+                group.wait()
+
+    # ----------------------- Знімки -----------------------
+
+    def needs_snapshot(self) -> bool:
+        return self.snapshot_cut is None and self.records_since_snapshot >= self.snapshot_interval
+
+    @property
+    def snapshot_cut(self):
+        """Точка знімка, який зараз пишеться (None - знімок не пишеться)"""
+        return self._snapshot_cut
+
+    def begin_snapshot(self):
+        """
+        Фіксує точку знімка: стан, знятий разом з нею, містить усі записи до неї.
+        Викликається, коли стан не змінюється (під замком власника).
+
+        :return: Точка для write_snapshot або None, якщо інший знімок уже пишеться.
+        """
+        with self._lock:
+            if self._snapshot_cut is not None:
+                return None
+            self._snapshot_cut = (self._appended_bytes, self.records_since_snapshot)
+            return self._snapshot_cut
+
+    def write_snapshot(self, state: bytes, cut=None):
+        """
+        Атомарно записує знімок і викидає з журналу записи до точки знімка.
+
+        :param state: Знімок стану.
+        :param cut: Точка з begin_snapshot. Без неї стан має містити всі записи,
+                    додані до виклику, і не змінюватися під час нього.
+        """
+        if cut is None:
+            cut = self.begin_snapshot()
+            if cut is None:
+                raise ValueError("Інший знімок уже пишеться")
+        try:
+            self.flush()
+            write_atomic(self.snapshot_path, state)
+            self._compact(*cut)
+        finally:
+            with self._lock:
+                self._snapshot_cut = None
+
+    def _compact(self, cut_bytes: int, cut_records: int):
+        """Лишає в журналі тільки записи після точки знімка"""
+        with self._write_lock:
+            if self._file is None:
+                if os.path.exists(self.log_path):
+                    os.truncate(self.log_path, 0)
+                with self._lock:
+                    self.records_since_snapshot -= cut_records
+                return
+
+            # Записи після точки вже у файлі або ще в групах, що чекають запису
+            header = _frame(RECORD_HEADER + self.identity) if self.identity is not None else b''
+            with open(self.log_path, 'rb') as f:
+                f.seek(cut_bytes)
+                tail = f.read(self._written_bytes - cut_bytes)
+            write_atomic(self.log_path, header + tail)
+            self._file.close()
+            self._file = open(self.log_path, 'ab', buffering=0)
+            removed = cut_bytes - len(header)
+            with self._lock:
+                self._written_bytes -= removed
+                self._appended_bytes -= removed
+                self.records_since_snapshot -= cut_records
+
+    def close(self):
+        """Записує залишок журналу і зупиняє потік"""
+        with self._lock:
+            self._closed = True
+            self._has_pending.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,79 @@
+"""
+Збереження ключів комісії на диску, щоб не генерувати їх при кожному запуску.
+
+Ключ зв'язку (cryptography) і ключ підпису (PyCryptodome) зберігаються
+у PEM (PKCS#8), за потреби зашифровані паролем. Файли створюються з правами 0600.
+"""
+
+import os
+
+from Crypto.PublicKey import RSA
+from cryptography.hazmat.primitives import serialization
+
+from atomic_file import write_atomic
+from blind_signature import DEFAULT_SIGN_KEY_SIZE
+from encryption_decryption import generate_rsa_keys
+
+COMM_KEY_NAME = 'commission_comm_key.pem'
+SIGN_KEY_NAME = 'commission_sign_key.pem'
+
+
+def _write_private_file(path: str, data: bytes):
+    """Атомарний запис файлу, доступного лише власнику"""
+    write_atomic(path, data, mode=0o600)
+
+
+def save_commission_keys(keys_dir: str, private_comm_key, sign_key, passphrase: bytes | None = None):
+    """
+    Записує ключі комісії в каталог.
+
+    :param private_comm_key: Приватний ключ зв'язку (cryptography).
+    :param sign_key: Ключ підпису (PyCryptodome RsaKey).
+    :param passphrase: Необов'язковий пароль для шифрування файлів.
+    """
+    os.makedirs(keys_dir, exist_ok=True)
+
+    encryption = (serialization.BestAvailableEncryption(passphrase) if passphrase
+                  else serialization.NoEncryption())
+    comm_pem = private_comm_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        encryption
+    )
+    if passphrase:
+        sign_pem = sign_key.export_key(format='PEM', pkcs=8, passphrase=passphrase,
+                                       protection='PBKDF2WithHMAC-SHA512AndAES256-CBC')
+    else:
+        sign_pem = sign_key.export_key(format='PEM', pkcs=8)
+
+    _write_private_file(os.path.join(keys_dir, COMM_KEY_NAME), comm_pem)
+    _write_private_file(os.path.join(keys_dir, SIGN_KEY_NAME), sign_pem)
+
+
+def load_commission_keys(keys_dir: str, passphrase: bytes | None = None):
+    """
+    Завантажує ключі комісії з каталогу.
+
+    :return: (приватний ключ зв'язку, ключ підпису).
+    """
+    with open(os.path.join(keys_dir, COMM_KEY_NAME), 'rb') as f:
+        private_comm_key = serialization.load_pem_private_key(f.read(), password=passphrase)
+    with open(os.path.join(keys_dir, SIGN_KEY_NAME), 'rb') as f:
+        sign_key = RSA.import_key(f.read(), passphrase=passphrase)
+    return private_comm_key, sign_key
+
+
+def load_or_create_commission_keys(keys_dir: str, passphrase: bytes | None = None, sign_key_size=DEFAULT_SIGN_KEY_SIZE):
+    """
+    Завантажує ключі комісії, а якщо їх ще немає - генерує і зберігає.
+
+    :return: (приватний ключ зв'язку, ключ підпису).
+    """
+    if (os.path.exists(os.path.join(keys_dir, COMM_KEY_NAME))
+            and os.path.exists(os.path.join(keys_dir, SIGN_KEY_NAME))):
+        return load_commission_keys(keys_dir, passphrase)
+
+    private_comm_key, _ = generate_rsa_keys()
+    sign_key = RSA.generate(sign_key_size)
+    save_commission_keys(keys_dir, private_comm_key, sign_key, passphrase)
+    return private_comm_key, sign_key
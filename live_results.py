@@ -0,0 +1,186 @@
+"""
+Живі результати голосування: фоновий потік раз на interval секунд знімає
+підсумки комісії і публікує їх як незмінний знімок.
+
+Знімок береться через tally_snapshot() комісії без замка стану, а
+публікація - це заміна посилання на попередній знімок, тому читачі
+(дашборди, сервер, рендерер графіків) ніколи не затримують підрахунок.
+Рендерер малює графіки без дисплея (matplotlib Agg) в окремому процесі,
+щоб не ділити GIL з підрахунком, і завжди бере лише найсвіжіший знімок.
+
+Приклад:
+    feed = LiveResults(commission, interval=1.0)
+    feed.subscribe(ChartRenderer('data/results').submit)
+    feed.start()
+    ...
+    print(feed.latest())
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from atomic_file import atomic_write, write_atomic
+
+
+class LiveResults:
+    def __init__(self, commission, interval=1.0):
+        """
+        :param commission: Commission або ShardedCommission (потрібен метод tally_snapshot).
+        :param interval: Як часто публікувати знімок, секунд.
+        """
+        self.commission = commission
+        self.interval = interval
+        self._latest = None
+        self._sequence = 0
+        self._subscribers = []
+        self._updated = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='live-results', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Зупиняє потік, публікуючи останній знімок"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def subscribe(self, callback):
+        """callback(snapshot) викликається в потоці публікації після кожного знімка"""
+        self._subscribers.append(callback)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.publish()
+        self.publish()
+
+    def publish(self) -> dict:
+        """Знімає і публікує підсумки негайно"""
+        state = self.commission.tally_snapshot()
+        counts = [int(count) for count in state['counts']]
+        register_size = state['register_size']
+
+        self._sequence += 1
+        snapshot = {
+            'sequence': self._sequence,
+            'timestamp': time.time(),
+            'candidates': list(state['names']),
+            'votes': counts,
+            'counted': state['counted'],
+            'registered': state['registered'],
+            'register_size': register_size,
+            'turnout': state['counted'] / register_size if register_size else 0.0,
+            'registration_turnout': state['registered'] / register_size if register_size else 0.0,
+        }
+
+        with self._updated:
+            self._latest = snapshot
+            self._updated.notify_all()
+        for callback in self._subscribers:
+            callback(snapshot)
+        return snapshot
+
+    def latest(self) -> dict | None:
+        """Останній опублікований знімок (None, якщо ще не було жодного)"""
+        return self._latest
+
+    def wait_for_update(self, after_sequence=0, timeout=None) -> dict | None:
+        """Чекає знімка з номером, більшим за after_sequence (для довгого опитування)"""
+        with self._updated:
+            self._updated.wait_for(
+                lambda: self._latest is not None and self._latest['sequence'] > after_sequence, timeout)
+            return self._latest
+
+
+def render_files(snapshot: dict, chart_path: str, json_path: str):
+    """Записує знімок у файли (атомарно, щоб дашборд не прочитав недописаний файл)"""
+    # Безголовий бекенд, імпорт тут, щоб модуль не тягнув matplotlib без потреби
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.bar(snapshot['candidates'], snapshot['votes'])
+    ax.set_title(f"Голоси кандидатів (явка {snapshot['turnout'] * 100:.1f}%)")
+    ax.set_xlabel('Кандидати')
+    ax.set_ylabel('Кількість голосів')
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+
+    try:
+        with atomic_write(chart_path) as f:
+            fig.savefig(f, format=os.path.splitext(chart_path)[1][1:] or 'png')
+    finally:
+        plt.close(fig)
+
+    write_atomic(json_path, json.dumps(snapshot, ensure_ascii=False, indent=2).encode('utf-8'))
+
+
+class ChartRenderer:
+    def __init__(self, output_dir: str, chart_name='results.png', json_name='results.json', use_process=True):
+        """
+        Рендерер знімків у файли: стовпчикова діаграма і JSON. Фоновий потік
+        передає знімки на малювання, проміжні знімки, які не встигли намалювати,
+        пропускаються.
+
+        :param output_dir: Каталог для файлів результатів.
+        :param use_process: Малювати в окремому процесі (інакше у фоновому потоці).
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.chart_path = os.path.join(output_dir, chart_name)
+        self.json_path = os.path.join(output_dir, json_name)
+        self.rendered = 0
+        self._executor = ProcessPoolExecutor(max_workers=1) if use_process else None
+
+        self._pending = None
+        self._has_pending = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='chart-renderer', daemon=True)
+        self._thread.start()
+
+    def submit(self, snapshot: dict):
+        """Ставить знімок у чергу на малювання, не чекаючи"""
+        with self._has_pending:
+            self._pending = snapshot
+            self._has_pending.notify()
+
+    def _run(self):
+        while True:
+            with self._has_pending:
+                self._has_pending.wait_for(lambda: self._pending is not None or self._closed)
+                snapshot, self._pending = self._pending, None
+            if snapshot is None:
+                return
+            self.render(snapshot)
+
+    def render(self, snapshot: dict):
+        """Малює знімок і чекає запису файлів"""
+        if self._executor is None:
+            render_files(snapshot, self.chart_path, self.json_path)
+        else:
+            self._executor.submit(render_files, snapshot, self.chart_path, self.json_path).result()
+        self.rendered += 1
+
+    def close(self):
+        """Домальовує останній знімок і зупиняє потік"""
+        with self._has_pending:
+            self._closed = True
+            self._has_pending.notify()
+        self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown()
@@ -0,0 +1,198 @@
+"""
+Неінтерактивний генератор навантаження: синтетичний реєстр і список кандидатів,
+N виборців із заданим розподілом виборів, повний шлях
+Voter -> register_ballot -> count_vote та звіт у форматі JSON.
+
+Приклад:
+    python load_generator.py --voters 200 --candidates 10 --distribution zipf --output report.json
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+import instrumentation
+
+from blind_signature import create_blinding_pool
+from commission import Commission, create_executor, DEFAULT_BALLOT_BOXES, DEFAULT_AUDIT_RATE
+from main import encrypt_ballot_kit, encrypt_blind_ballots, prepare_vote
+from voter import Voter
+
+PHASES = ['blinding', 'encryption', 'registration', 'signing', 'counting']
+
+
+def choice_weights(distribution: str, num_candidates: int, weights=None) -> list[float]:
+    """
+    Ваги виборів кандидатів.
+
+    :param distribution: 'uniform', 'zipf' (1/k) або 'weights' (явні ваги).
+    :param weights: Явні ваги для distribution='weights'.
+    """
+    if distribution == 'uniform':
+        return [1.0] * num_candidates
+    if distribution == 'zipf':
+        return [1.0 / (k + 1) for k in range(num_candidates)]
+    if distribution == 'weights':
+        if not weights or len(weights) != num_candidates:
+            raise ValueError("Кількість ваг має дорівнювати кількості кандидатів")
+        return list(weights)
+    raise ValueError(f"Невідомий розподіл: {distribution}")
+
+
+def summarize(samples: list[float]) -> dict:
+    """Перцентилі затримки в мілісекундах"""
+    values = np.asarray(samples) * 1e3
+    return {
+        'count': len(samples),
+        'mean_ms': float(values.mean()),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p90_ms': float(np.percentile(values, 90)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(values.max()),
+    }
+
+
+def run(num_voters, num_candidates, register_size=None, distribution='uniform', weights=None,
+        blinding_pool_size=0, executor_kind=None, workers=None, seed=0,
+        ballot_boxes=DEFAULT_BALLOT_BOXES, audit_rate=DEFAULT_AUDIT_RATE, metrics=False) -> dict:
+    """
+    Проганяє виборців через повний шлях голосування і повертає звіт.
+
+    :param num_voters: Скільки виборців голосує.
+    :param num_candidates: Кількість кандидатів.
+    :param register_size: Розмір реєстру (не менше за num_voters).
+    :param distribution: Розподіл виборів (choice_weights).
+    :param blinding_pool_size: Розмір пулу факторів засліплення (0 - без пулу).
+    :param executor_kind: None, 'thread' або 'process' для пулу комісії.
+    :param workers: Кількість робітників пулу комісії.
+    :param ballot_boxes: Скільки скриньок у наборі виборця.
+    :param audit_rate: Частка скриньок, які комісія відкриває при реєстрації.
+    :param metrics: Додати до звіту метрики операцій (instrumentation).
+    """
+    register_size = max(register_size or num_voters, num_voters)
+    rng = random.Random(seed)
+    voter_ids = [hashlib.sha1(str(i).encode('utf-8')).hexdigest() for i in range(register_size)]
+    candidates = [f'Кандидат {i + 1}' for i in range(num_candidates)]
+    choices = rng.choices(range(1, num_candidates + 1),
+                          weights=choice_weights(distribution, num_candidates, weights), k=num_voters)
+
+    executor = create_executor(executor_kind, workers) if executor_kind else None
+    commission = Commission(voter_ids, candidates, executor, ballot_boxes=ballot_boxes, audit_rate=audit_rate,
+                            workers=workers)
+    blinding_pool = create_blinding_pool(commission.public_sign_key, blinding_pool_size) if blinding_pool_size else None
+
+    samples = {phase: [] for phase in PHASES}
+    if metrics:
+        instrumentation.reset()
+        instrumentation.enable()
+
+    # Час підпису міряється окремо від решти реєстрації
+    sign_blind_ballots = commission.sign_blind_ballots
+
+    def timed_sign_blind_ballots(blind_ballots):
+        start = time.perf_counter()
+        try:
+            return sign_blind_ballots(blind_ballots)
+        finally:
+            samples['signing'].append(time.perf_counter() - start)
+
+    commission.sign_blind_ballots = timed_sign_blind_ballots
+
+    started = time.perf_counter()
+    for voter_number, voters_choice in enumerate(choices):
+        start = time.perf_counter()
+        voter = Voter(voter_ids[voter_number], candidates, commission.public_sign_key,
+                      blinding_pool=blinding_pool, ballot_boxes=ballot_boxes)
+        # Бюлетені створюються ліниво, звертаємось до них тут, щоб засліплення потрапило у свою фазу
+        ballot_kit, blind_ballots = voter.ballot_kit, voter.blind_ballots
+        samples['blinding'].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ballot_kit = encrypt_ballot_kit(ballot_kit, commission.public_comm_key)
+        blind_ballots = encrypt_blind_ballots(blind_ballots, commission.public_comm_key)
+        encryption_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        blind_signatures = commission.register_ballot(ballot_kit, blind_ballots)
+        samples['registration'].append(time.perf_counter() - start - samples['signing'][-1])
+
+        start = time.perf_counter()
+        envelope = prepare_vote(voter, blind_signatures, voters_choice, commission.public_comm_key)
+        samples['encryption'].append(encryption_time + time.perf_counter() - start)
+
+        start = time.perf_counter()
+        commission.count_vote(*envelope)
+        samples['counting'].append(time.perf_counter() - start)
+
+    elapsed = time.perf_counter() - started
+
+    candidates_results, number_of_voted, _ = commission.get_results()
+    report = {
+        'config': {
+            'voters': num_voters,
+            'candidates': num_candidates,
+            'register_size': register_size,
+            'distribution': distribution,
+            'blinding_pool_size': blinding_pool_size,
+            'executor': executor_kind,
+            'workers': workers,
+            'seed': seed,
+            'ballot_boxes': ballot_boxes,
+            'audit_rate': audit_rate,
+        },
+        'elapsed_s': elapsed,
+        'voters_per_second': num_voters / elapsed,
+        'phases': {phase: summarize(values) for phase, values in samples.items()},
+        'results': {
+            'counted': number_of_voted,
+            'votes': [int(count) for count in candidates_results['Votes_Count']],
+        },
+    }
+    if metrics:
+        report['metrics'] = instrumentation.export_json()
+        instrumentation.disable()
+    if blinding_pool is not None:
+        report['blinding_pool'] = blinding_pool.stats()
+        blinding_pool.close()
+    if executor is not None:
+        executor.shutdown()
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--voters', type=int, default=50)
+    parser.add_argument('--candidates', type=int, default=5)
+    parser.add_argument('--register-size', type=int, default=None)
+    parser.add_argument('--distribution', choices=['uniform', 'zipf', 'weights'], default='uniform')
+    parser.add_argument('--weights', type=float, nargs='+', default=None)
+    parser.add_argument('--blinding-pool-size', type=int, default=0)
+    parser.add_argument('--executor', choices=['thread', 'process'], default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ballot-boxes', type=int, default=DEFAULT_BALLOT_BOXES)
+    parser.add_argument('--audit-rate', type=float, default=DEFAULT_AUDIT_RATE)
+    parser.add_argument('--metrics', action='store_true', help='Додати до звіту метрики операцій')
+    parser.add_argument('--output', default=None, help='Файл для звіту JSON (за замовчуванням stdout)')
+    args = parser.parse_args()
+
+    report = run(args.voters, args.candidates, args.register_size, args.distribution, args.weights,
+                 args.blinding_pool_size, args.executor, args.workers, args.seed,
+                 args.ballot_boxes, args.audit_rate, args.metrics)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
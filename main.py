@@ -1,63 +1,88 @@
 from encryption_decryption import *
 from voter import Voter
 from commission import Commission
+from ballot_format import parse_ballot_text, serialize_ballot_box
+from blind_signature import create_blinding_pool
+from key_store import load_or_create_commission_keys
+from register_cache import load_register
+from bulletin_board import BulletinBoard, verify_inclusion, verify_signed_root
+from journal import Journal
+from live_results import LiveResults, ChartRenderer
 import pandas as pd
-import matplotlib.pyplot as plt
-import hashlib
 
 
-# Функція парсингу
-def parse_and_encrypt_ballot(ballot_text, commission_public_key):
-    # Парсимо дані
-    ballot_id_line = next(line for line in ballot_text.split("\n") if line.startswith("Ідентифікатор бюлетеня:"))
-    ballot_id = ballot_id_line.split(": ")[1].strip()
+# Файл з ІПН виборців
+VOTERS_FILE = 'data/voters_numbers.xlsx'
+# Кеш хешованого реєстру і збережені ключі комісії
+REGISTER_CACHE_DIR = 'data/cache'
+KEYS_DIR = 'data/keys'
+# Дошка оголошень із зарахованими бюлетенями
+BOARD_DIR = 'data/board'
+# Журнал реєстрацій і голосів: після збою стан комісії відновлюється з нього
+JOURNAL_DIR = 'data/journal'
+# Живі результати: графік і JSON оновлюються у фоні під час голосування
+RESULTS_DIR = 'data/results'
+RESULTS_INTERVAL = 1.0
+# Скільки факторів засліплення тримати обчисленими наперед
+BLINDING_POOL_SIZE = 256
 
-    voter_id_line = next(line for line in ballot_text.split("\n") if line.startswith("Ідентифікатор виборця:"))
-    voter_id = voter_id_line.split(": ")[1].strip()
 
-    choice_line = next(line for line in ballot_text.split("\n") if line.startswith("Ваш вибір:"))
-    voter_choice = choice_line.split(": ")[1].strip()
+# Шифрування набору скриньок: одна скринька - один гібридний конверт
+def encrypt_ballot_kit(ballot_kit, commission_public_key):
+    encrypted_ballot_kit = []
+    for ballot_box in ballot_kit:
+        ballots = [parse_ballot_text(ballot_text) for ballot_text in ballot_box]
+        encrypted_ballot_kit.append(hybrid_encrypt(serialize_ballot_box(ballots), commission_public_key))
+    return encrypted_ballot_kit
 
-    # Окреме шифрування кожного значення
-    encrypted_ballot_id = rsa_encrypt(ballot_id, commission_public_key)
 
-    encrypted_voter_id = rsa_encrypt(voter_id, commission_public_key)
+# Шифрування засліплених бюлетенів для передачі комісії
+def encrypt_blind_ballots(blind_ballots, commission_public_key):
+    return [hybrid_encrypt(blind_ballot, commission_public_key) for blind_ballot in blind_ballots]
 
-    encrypted_voter_choice = rsa_encrypt(voter_choice, commission_public_key)
 
-    # Повертаємо словник з зашифрованими значеннями
-    return {
-        'ballot_id': encrypted_ballot_id,
-        'voter_id': encrypted_voter_id,
-        'voter_choice': encrypted_voter_choice
-    }
+# Підготовка голосу: розсліплення підпису обраного бюлетеня і шифрування для комісії
+def prepare_vote(voter, blind_signatures, voters_choice, commission_public_key):
+    # Розсліплюємо підпис, після цього секрети виборця знищуються
+    ballot_text, unblinded_sig = voter.cast_vote(blind_signatures, voters_choice)
+
+    # Шифруємо обраний бюлетень
+    encrypted_voting_ballot = rsa_encrypt(ballot_text, commission_public_key)
+
+    # Шифруємо підпис для передачі комісії
+    encrypted_voting_signature, sign_aes_key = hybrid_encrypt(unblinded_sig, commission_public_key)
+
+    return encrypted_voting_ballot, encrypted_voting_signature, sign_aes_key
 
 
 def main():
     # Завантаження даних виборців і кандидатів
-    tax_numbers = pd.read_excel('data/voters_numbers.xlsx', dtype=int)
-    tax_numbers = tax_numbers['Voter_ID'].tolist()
+    # Хеші ІПН беруться з кешу, прив'язаного до контрольної суми файлу виборців
+    voters_registry = load_register(VOTERS_FILE, REGISTER_CACHE_DIR)
     candidates_names = pd.read_excel('data/candidates.xlsx')
     candidates_names = candidates_names['Candidates'].tolist()
 
-    # Створення списку прихованих ID виборців
-    hidden_tax_numbers = []
+    # Ініціалізація комісії зі збереженими ключами, стан відновлюється з журналу
+    commission = Commission(voters_registry, candidates_names, journal=Journal(JOURNAL_DIR),
+                            keys=load_or_create_commission_keys(KEYS_DIR), bulletin_board=BulletinBoard(BOARD_DIR))
 
-    for voter_tax_num in tax_numbers:
-        hidden_tax_num = hashlib.sha1(str(voter_tax_num).encode('utf-8')).hexdigest()
-        hidden_tax_numbers.append(hidden_tax_num)
-
-    # Ініціалізація комісії
-    commission = Commission(hidden_tax_numbers, candidates_names)
+    # Фонове заповнення пулу факторів засліплення для ключа підпису комісії
+    blinding_pool = create_blinding_pool(commission.public_sign_key, size=BLINDING_POOL_SIZE)
+    # Живі результати публікуються у фоні і малюються у файли, не зупиняючи голосування
+    chart_renderer = ChartRenderer(RESULTS_DIR)
+    live_results = LiveResults(commission, interval=RESULTS_INTERVAL)
+    live_results.subscribe(chart_renderer.submit)
+    live_results.start()
 
     print("Систему запущено")
-    print(f"Знайдено {len(hidden_tax_numbers)} виборців")
+    print(f"Живі результати оновлюються в {RESULTS_DIR}")
+    print(f"Знайдено {len(voters_registry)} виборців")
     print(f"Знайдено {len(candidates_names)} кандидатів")
 
     while True:
         # ----------------------- Авторизація виборця -----------------------
         print('\nЗареєструйтесь, для цього введіть свій номер виборця')
-        print(f'Всього зареєстровано {len(hidden_tax_numbers)} виборців')
+        print(f'Всього зареєстровано {len(voters_registry)} виборців')
 
         voters_num = input("Введіть номер виборця ")
 
@@ -67,33 +92,25 @@ def main():
         else:
             raise ValueError("Ви неправильно ввели свій номер за списком")
 
-        if not (1 <= voters_num <= len(hidden_tax_numbers)):
-            raise ValueError(f"Номер виборця має бути від 1 до {len(hidden_tax_numbers)}")
+        if not (1 <= voters_num <= len(voters_registry)):
+            raise ValueError(f"Номер виборця має бути від 1 до {len(voters_registry)}")
 
         print('\nАвторизація успішна!\n')
 
         # ----------------------- Реєстрація бюлетенів виборця -----------------------
         print("Генеруємо і реєструємо бюлетені")
         # Створюємо об'єкт виборця
-        current_voter = Voter(hidden_tax_numbers[voters_num - 1], candidates_names)
-
-        # Шифруємо набір бюлетенів
-        encrypted_ballot_kit = []
-        for ballot_box in current_voter.ballot_kit:
-            encrypted_box = []
-            for ballot_text in ballot_box:
-                # Парсинг і шифрування бюлетеня
-                encrypted_ballot = parse_and_encrypt_ballot(ballot_text, commission.public_comm_key)
-                encrypted_box.append(encrypted_ballot)
-            encrypted_ballot_kit.append(encrypted_box)
+        current_voter = Voter(voters_registry.voter_id(voters_num - 1), candidates_names,
+                              commission.public_sign_key, blinding_pool=blinding_pool)
+
+        # Шифруємо набір бюлетенів, скриньки створюються потоком і не зберігаються
+        encrypted_ballot_kit = encrypt_ballot_kit(current_voter.iter_ballot_kit(), commission.public_comm_key)
 
         # Шифруємо сліпі бюлетені
-        encrypted_blind_ballots = []
-        for blind_ballot in current_voter.blind_ballots:
-            encrypted_blind_ballots.append(hybrid_encrypt(blind_ballot, commission.public_comm_key))
+        encrypted_blind_ballots = encrypt_blind_ballots(current_voter.blind_ballots, commission.public_comm_key)
 
         # Реєстрація бюлетенів і отримання сліпих підписів
-        blind_signatures = commission.register_ballot(encrypted_ballot_kit, encrypted_blind_ballots, current_voter.bs)
+        blind_signatures = commission.register_ballot(encrypted_ballot_kit, encrypted_blind_ballots)
 
         print('Бюлетені зареєстровано!\n')
 
@@ -115,28 +132,24 @@ def main():
 
 
         # ----------------------- Обробка голосу виборця -----------------------
-        # Шифруємо обраний бюлетень і його підпис
-        encrypted_voting_ballot = rsa_encrypt(
-            current_voter.ballot_texts[voters_choice-1],
-            commission.public_comm_key
+        # Розсліплюємо підпис і шифруємо бюлетень з підписом
+        encrypted_voting_ballot, encrypted_voting_signature, sign_aes_key = prepare_vote(
+            current_voter, blind_signatures, voters_choice, commission.public_comm_key
         )
 
-        # Розсліплюємо підпис
-        unblinded_sig = current_voter.bs.unblind_signature(
-            blind_signatures[voters_choice-1],
-            current_voter.generated_r[voters_choice-1]
-        )
-
-        # Шифруємо підпис для передачі комісії
-        encrypted_voting_signature, sign_aes_key = hybrid_encrypt(
-            unblinded_sig,
-            commission.public_comm_key)
-
         # Підрахунок голосу
-        commission.count_vote(encrypted_voting_ballot, encrypted_voting_signature, sign_aes_key, current_voter.bs)
+        commission.count_vote(encrypted_voting_ballot, encrypted_voting_signature, sign_aes_key)
 
         print(f"\nГолос виборця {voters_num} за кандидата {candidates_names[voters_choice - 1]} успішно зараховано")
 
+        # Виборець перевіряє, що його бюлетень є на дошці оголошень
+        ballot_id = current_voter.ballot_id
+        receipt = commission.inclusion_proof(ballot_id)
+        root = receipt['root']
+        if verify_signed_root(root, commission.public_comm_key) and verify_inclusion(
+                receipt['leaf'], receipt['index'], root['tree_size'], receipt['proof'], root['root']):
+            print(f"Бюлетень {ballot_id} є на дошці оголошень під номером {receipt['index'] + 1}")
+
         # ----------------------- Результати голосування -----------------------
 
         code = input("Введіть 1 якщо хочете продовжити, 2 якщо завершити голосування ")
@@ -149,27 +162,24 @@ def main():
         if code == 1:
             continue
         elif code == 2:
-            candidates_results, number_of_voted, counted_ballots = commission.get_results()
-
-            # Візуалізуємо результати голосувань
-            plt.figure(figsize=(10, 6))
-            plt.bar(candidates_results['Name'], candidates_results['Votes_Count'])
-            plt.title('Голоси кандидатів')
-            plt.xlabel('Кандидати')
-            plt.ylabel('Кількість голосів')
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            plt.show()
-
-            index_of_winner = candidates_results['Votes_Count'].idxmax()
-            print(f"Найбільше голосів у {candidates_results.loc[index_of_winner, 'Name']}")
-            print(f"Явка склала {number_of_voted} чол. або {number_of_voted/len(tax_numbers) * 100}%")
-
-            print("\nЗараховані бюлетені\n")
-            for ballot_id, ballot in counted_ballots.items():
-                print(f"ID бюлетеня: {ballot_id}; Текст: {ballot}")
-
-            exit()
+            # Останній знімок публікується при зупинці, графік дописується у файл
+            live_results.stop()
+            chart_renderer.close()
+            results = live_results.latest()
+
+            index_of_winner = max(range(len(results['votes'])), key=results['votes'].__getitem__)
+            print(f"Найбільше голосів у {results['candidates'][index_of_winner]}")
+            print(f"Явка склала {results['counted']} чол. або {results['turnout'] * 100}%")
+            print(f"Графік результатів: {chart_renderer.chart_path}")
+
+            root = commission.bulletin_root()
+            commission.bulletin_board.flush()
+            print(f"\nДошка оголошень: {root['tree_size']} бюлетенів, корінь {root['root'].hex()}")
+            print(f"Бюлетені зберігаються в {BOARD_DIR}")
+
+            blinding_pool.close()
+            commission.journal.close()
+            break
         else:
             ValueError("Код повинен бути 1 або 2")
 
@@ -0,0 +1,98 @@
+"""
+Пул заздалегідь обчислених значень (ключі RSA, фактори засліплення тощо),
+який поповнюється у фоновому потоці. Якщо пул порожній, значення
+обчислюється на місці, а промах фіксується у статистиці.
+"""
+
+import threading
+from collections import deque
+
+
+class PrecomputePool:
+    def __init__(self, factory, size=16, name='pool', start=True):
+        """
+        :param factory: Функція без аргументів, яка обчислює одне значення.
+        :param size: Скільки значень тримати напоготові.
+        :param name: Назва пулу для статистики.
+        :param start: Чи запускати фонове поповнення одразу.
+        """
+        if size < 0:
+            raise ValueError("Розмір пулу не може бути від'ємним")
+
+        self._factory = factory
+        self.size = size
+        self.name = name
+        self._items = deque()
+        self._refill_needed = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+
+        if start and size > 0:
+            self.start()
+
+    def start(self):
+        """Запускає фоновий потік поповнення"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._fill_loop, name=f'{self.name}-filler', daemon=True)
+        self._refill_needed.set()
+        self._thread.start()
+
+    def _fill_loop(self):
+        while True:
+            self._refill_needed.wait()
+            if self._closed:
+                return
+            # Скидаємо прапорець до поповнення, щоб не пропустити сигнал від get()
+            self._refill_needed.clear()
+            while len(self._items) < self.size and not self._closed:
+                self._items.append(self._factory())
+
+    def get(self):
+        """Повертає значення з пулу або обчислює його на місці, якщо пул порожній"""
+        try:
+            item = self._items.popleft()
+            hit = True
+        except IndexError:
+            item = self._factory()
+            hit = False
+
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        self._refill_needed.set()
+        return item
+
+    def stats(self) -> dict:
+        """Статистика використання пулу"""
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'name': self.name,
+            'size': self.size,
+            'available': len(self._items),
+            'hits': hits,
+            'misses': misses,
+            'miss_rate': misses / total if total else 0.0,
+        }
+
+    def close(self):
+        """Зупиняє фоновий потік поповнення"""
+        self._closed = True
+        self._refill_needed.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
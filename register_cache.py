@@ -0,0 +1,95 @@
+"""
+Кеш хешованого реєстру виборців.
+
+Хеші ІПН і хеш-таблиця реєстру зберігаються у файлах .npy, прив'язаних до
+контрольної суми вихідного файлу, і відображаються в пам'ять при запуску.
+При промаху кешу ІПН хешуються паралельно в кількох процесах.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from atomic_file import atomic_write
+from voter_registry import VoterRegistry, DIGEST_SIZE
+
+# Менші реєстри хешуються в поточному процесі
+PARALLEL_HASH_THRESHOLD = 200_000
+
+
+def file_checksum(path: str, chunk_size=1 << 20) -> str:
+    """SHA-256 вмісту файлу"""
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def _hash_chunk(tax_numbers: list[str]) -> bytes:
+    """SHA-1 дайджести частини ІПН одним рядком байтів"""
+    sha1 = hashlib.sha1
+    return b''.join(sha1(tax_number.encode('utf-8')).digest() for tax_number in tax_numbers)
+
+
+def hash_tax_numbers(tax_numbers: list[str], workers=None) -> np.ndarray:
+    """
+    Хешує ІПН у масив дайджестів форми (N, 20), великі списки - паралельно.
+
+    :param workers: Кількість процесів (None - за кількістю ядер).
+    """
+    if len(tax_numbers) < PARALLEL_HASH_THRESHOLD:
+        joined = _hash_chunk(tax_numbers)
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunk_size = -(-len(tax_numbers) // (workers * 4))
+        chunks = [tax_numbers[i:i + chunk_size] for i in range(0, len(tax_numbers), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            joined = b''.join(executor.map(_hash_chunk, chunks))
+
+    return np.frombuffer(joined, dtype=np.uint8).reshape(-1, DIGEST_SIZE)
+
+
+def read_tax_numbers(source_path: str, column='Voter_ID') -> list[str]:
+    """Читає ІПН з Excel або CSV файлу"""
+    if source_path.endswith('.csv'):
+        frame = pd.read_csv(source_path, dtype={column: 'int64'})
+    else:
+        frame = pd.read_excel(source_path, dtype={column: 'int64'})
+    return frame[column].astype(str).tolist()
+
+
+def _save_array(path: str, array: np.ndarray):
+    """Атомарний запис масиву .npy"""
+    with atomic_write(path) as f:
+        np.save(f, array)
+
+
+def load_register(source_path: str, cache_dir: str, column='Voter_ID', workers=None) -> VoterRegistry:
+    """
+    Завантажує реєстр з кешу, а при промаху читає вихідний файл, хешує ІПН і зберігає кеш.
+
+    :param source_path: Файл з ІПН виборців (.xlsx або .csv).
+    :param cache_dir: Каталог для кешу.
+    :param column: Назва колонки з ІПН.
+    :param workers: Кількість процесів для хешування при промаху.
+    """
+    # Ключ кешу залежить і від вмісту файлу, і від колонки з ІПН
+    checksum = hashlib.sha256(f'{file_checksum(source_path)}:{column}'.encode('utf-8')).hexdigest()[:32]
+    digests_path = os.path.join(cache_dir, f'register-{checksum}-digests.npy')
+    table_path = os.path.join(cache_dir, f'register-{checksum}-table.npy')
+
+    if os.path.exists(digests_path) and os.path.exists(table_path):
+        digests = np.load(digests_path, mmap_mode='r')
+        hash_table = np.load(table_path, mmap_mode='r')
+        return VoterRegistry.from_digests(digests, hash_table)
+
+    registry = VoterRegistry.from_digests(hash_tax_numbers(read_tax_numbers(source_path, column), workers))
+
+    os.makedirs(cache_dir, exist_ok=True)
+    _save_array(digests_path, registry.digests)
+    _save_array(table_path, registry.hash_table)
+    return registry
@@ -0,0 +1,318 @@
+"""
+Мережевий сервіс комісії на asyncio.
+
+Протокол: TCP, кожне повідомлення - кадр <u32 довжина><JSON у UTF-8>, байтові
+поля передаються в base64. Запит {"id": ..., "method": ..., "params": {...}},
+відповідь {"id": ..., "result": {...}} або {"id": ..., "error": "..."}.
+
+Методи:
+    public_keys - публічні ключі зв'язку і підпису комісії (PEM);
+    register    - register_ballot(ballot_kit, blind_ballots) -> signatures;
+    count       - count_vote(ballot, signature, aes_key);
+    metrics     - лічильники сервера і метрики instrumentation (format: "json" або "prometheus");
+    board_root  - підписаний корінь дошки оголошень;
+    inclusion_proof - доказ зарахування бюлетеня за його ID;
+    results     - останній знімок живих результатів (after - довге опитування до
+                  знімка з більшим номером, timeout - скільки секунд чекати).
+
+Робота з RSA виконується в пулі потоків, тому цикл подій не блокується.
+Кількість з'єднань, запитів в обробці та розмір кадру обмежені.
+
+Запуск із синтетичним реєстром:
+    python server.py --port 8765 --synthetic-voters 10000 --candidates 5
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cryptography.hazmat.primitives import serialization
+
+import instrumentation
+from ballot_archive import ArchiveWriter
+from bulletin_board import BulletinBoard
+from commission import Commission
+from journal import Journal
+from live_results import LiveResults
+
+_FRAME_HEADER = struct.Struct('<I')
+
+DEFAULT_MAX_CONNECTIONS = 10_000
+DEFAULT_MAX_IN_FLIGHT = 64
+DEFAULT_MAX_FRAME_SIZE = 1 << 20
+DEFAULT_IDLE_TIMEOUT = 60.0
+# Як часто архів конвертів скидається на диск: збій втрачає не більше трафіку за цей час
+ARCHIVE_SYNC_INTERVAL = 1.0
+
+
+def encode_bytes(data: bytes) -> str:
+    return base64.b64encode(data).decode('ascii')
+
+
+def decode_bytes(data: str) -> bytes:
+    return base64.b64decode(data, validate=True)
+
+
+async def read_frame(reader: asyncio.StreamReader, max_frame_size: int) -> dict | None:
+    """Читає один кадр, None - з'єднання закрито"""
+    try:
+        header = await reader.readexactly(_FRAME_HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (length,) = _FRAME_HEADER.unpack(header)
+    if length > max_frame_size:
+        raise ValueError(f"Кадр завеликий: {length} байтів")
+    try:
+        payload = await reader.readexactly(length)
+    except asyncio.IncompleteReadError as e:
+        raise ValueError("Кадр обірвано") from e
+    return json.loads(payload)
+
+
+def write_frame(writer: asyncio.StreamWriter, message: dict):
+    payload = json.dumps(message, ensure_ascii=False).encode('utf-8')
+    writer.write(_FRAME_HEADER.pack(len(payload)) + payload)
+
+
+class CommissionServer:
+    def __init__(self, commission: Commission, executor=None, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT, max_frame_size=DEFAULT_MAX_FRAME_SIZE,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, live_results=None, archive=None):
+        """
+        :param commission: Комісія, яку обслуговує сервер.
+        :param executor: Пул для RSA (None - пул потоків за замовчуванням).
+        :param max_connections: Скільки сесій виборців приймати одночасно, решта отримують відмову.
+        :param max_in_flight: Скільки запитів одночасно обробляти, решта чекають (зворотний тиск).
+        :param max_frame_size: Найбільший розмір запиту в байтах.
+        :param idle_timeout: Через скільки секунд без запитів закривати з'єднання.
+        :param live_results: Стрічка живих результатів (live_results.LiveResults) для методу results.
+        :param archive: Архів (ballot_archive.ArchiveWriter), куди пишеться кожен отриманий конверт голосу.
+        """
+        self.commission = commission
+        self.executor = executor or ThreadPoolExecutor()
+        self.max_connections = max_connections
+        self.max_frame_size = max_frame_size
+        self.idle_timeout = idle_timeout
+        self.live_results = live_results
+        self.archive = archive
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._connections = 0
+        self._server = None
+
+        self._public_keys = {
+            'comm_key': commission.public_comm_key.public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode('ascii'),
+            'sign_key': commission.public_sign_key.export_key(format='PEM').decode('ascii'),
+        }
+
+        self.stats = {'connections': 0, 'rejected': 0, 'requests': 0, 'errors': 0}
+
+    async def start(self, host='127.0.0.1', port=8765):
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def serve_forever(self, host='127.0.0.1', port=8765):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self._connections >= self.max_connections:
+            self.stats['rejected'] += 1
+            write_frame(writer, {'id': None, 'error': "Сервер перевантажений, спробуйте пізніше"})
+            await self._close_writer(writer)
+            return
+
+        self._connections += 1
+        self.stats['connections'] += 1
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_frame(reader, self.max_frame_size), self.idle_timeout)
+                except (asyncio.TimeoutError, ValueError) as e:
+                    write_frame(writer, {'id': None, 'error': str(e) or "Час очікування вичерпано"})
+                    break
+                if request is None:
+                    break
+
+                response = await self._dispatch(request)
+                write_frame(writer, response)
+                # Не читаємо наступний запит, доки клієнт не забере відповідь
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._connections -= 1
+            await self._close_writer(writer)
+
+    @staticmethod
+    async def _close_writer(writer: asyncio.StreamWriter):
+        try:
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def _dispatch(self, request: dict) -> dict:
+        request_id = request.get('id') if isinstance(request, dict) else None
+        self.stats['requests'] += 1
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("Запит має бути об'єктом JSON")
+            method = request.get('method')
+            params = request.get('params') or {}
+            if method == 'public_keys':
+                return {'id': request_id, 'result': self._public_keys}
+            if method == 'metrics':
+                return {'id': request_id, 'result': self._metrics(params)}
+            if method == 'results':
+                return {'id': request_id, 'result': await self._results(params)}
+            if method == 'register':
+                result = await self._run(self._register, params)
+            elif method == 'count':
+                result = await self._run(self._count, params)
+            elif method == 'board_root':
+                result = await self._run(self._board_root, params)
+            elif method == 'inclusion_proof':
+                result = await self._run(self._inclusion_proof, params)
+            else:
+                raise ValueError(f"Невідомий метод: {method}")
+            return {'id': request_id, 'result': result}
+        except Exception as e:
+            # Будь-яка помилка запиту (зокрема OSError журналу чи архіву) повертається клієнту,
+            # а не обриває обробник з'єднання
+            self.stats['errors'] += 1
+            return {'id': request_id, 'error': str(e) or type(e).__name__}
+
+    async def _run(self, func, params):
+        """Виконує роботу з RSA в пулі, обмежуючи кількість запитів в обробці"""
+        async with self._in_flight:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, params)
+
+    def _metrics(self, params: dict) -> dict:
+        if params.get('format') == 'prometheus':
+            return {'server': dict(self.stats), 'text': instrumentation.export_prometheus()}
+        return {'server': dict(self.stats), **instrumentation.export_json()}
+
+    async def _results(self, params: dict) -> dict:
+        if self.live_results is None:
+            raise ValueError("Живі результати не ввімкнено")
+        snapshot = self.live_results.latest()
+        after = params.get('after')
+        if after is not None:
+            # Довге опитування без потоку на кожного клієнта: перевіряємо раз на період публікації
+            deadline = time.monotonic() + min(float(params.get('timeout', 30.0)), self.idle_timeout)
+            while (snapshot is None or snapshot['sequence'] <= int(after)) and time.monotonic() < deadline:
+                await asyncio.sleep(min(self.live_results.interval, max(deadline - time.monotonic(), 0)))
+                snapshot = self.live_results.latest()
+        return {'snapshot': snapshot}
+
+    def _register(self, params: dict) -> dict:
+        ballot_kit = [(decode_bytes(box), decode_bytes(key)) for box, key in params['ballot_kit']]
+        blind_ballots = [(decode_bytes(ballot), decode_bytes(key)) for ballot, key in params['blind_ballots']]
+        signatures = self.commission.register_ballot(ballot_kit, blind_ballots)
+        return {'signatures': [encode_bytes(signature) for signature in signatures]}
+
+    def _count(self, params: dict) -> dict:
+        envelope = (decode_bytes(params['ballot']), decode_bytes(params['signature']), decode_bytes(params['aes_key']))
+        # Конверт архівується до перевірки, щоб перерахунок бачив увесь трафік дня
+        if self.archive is not None:
+            self.archive.write_envelope(*envelope)
+        self.commission.count_vote(*envelope)
+        return {'counted': True}
+
+    def _board_root(self, params: dict) -> dict:
+        return encode_root(self.commission.bulletin_root())
+
+    def _inclusion_proof(self, params: dict) -> dict:
+        receipt = self.commission.inclusion_proof(params['ballot_id'])
+        return {
+            'index': receipt['index'],
+            'leaf': encode_bytes(receipt['leaf']),
+            'proof': [encode_bytes(h) for h in receipt['proof']],
+            'root': encode_root(receipt['root']),
+        }
+
+
+def encode_root(root: dict) -> dict:
+    return {**root, 'root': encode_bytes(root['root']), 'signature': encode_bytes(root['signature'])}
+
+
+def decode_root(root: dict) -> dict:
+    return {**root, 'root': decode_bytes(root['root']), 'signature': decode_bytes(root['signature'])}
+
+
+def synthetic_voter_ids(num_voters: int) -> list[str]:
+    """Синтетичний реєстр: хеші ІПН 0..N-1 (так само рахує генератор навантаження)"""
+    return [hashlib.sha1(str(i).encode('utf-8')).hexdigest() for i in range(num_voters)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--synthetic-voters', type=int, default=1000)
+    parser.add_argument('--candidates', type=int, default=5)
+    parser.add_argument('--keys-dir', default=None, help='Каталог зі збереженими ключами комісії')
+    parser.add_argument('--board-dir', default=None, help='Каталог дошки оголошень (без нього дошка в пам\'яті)')
+    parser.add_argument('--journal-dir', default=None,
+                        help='Каталог журналу реєстрацій і голосів (без нього стан втрачається при перезапуску)')
+    parser.add_argument('--workers', type=int, default=None, help='Потоків для RSA')
+    parser.add_argument('--max-connections', type=int, default=DEFAULT_MAX_CONNECTIONS)
+    parser.add_argument('--max-in-flight', type=int, default=DEFAULT_MAX_IN_FLIGHT)
+    parser.add_argument('--metrics', action='store_true', help='Збирати метрики операцій (метод metrics)')
+    parser.add_argument('--archive', default=None, help='Файл архіву отриманих конвертів голосів')
+    parser.add_argument('--results-interval', type=float, default=1.0, help='Як часто публікувати живі результати, с')
+    args = parser.parse_args()
+    # Зі збереженими ключами старі конверти лишаються дійсними після перезапуску,
+    # тому без журналу кожен голос можна було б зарахувати ще раз
+    if args.keys_dir and not args.journal_dir:
+        parser.error("--keys-dir потребує --journal-dir")
+
+    if args.metrics:
+        instrumentation.enable()
+
+    keys = None
+    if args.keys_dir:
+        from key_store import load_or_create_commission_keys
+        keys = load_or_create_commission_keys(args.keys_dir)
+
+    commission = Commission(synthetic_voter_ids(args.synthetic_voters),
+                            [f'Кандидат {i + 1}' for i in range(args.candidates)], keys=keys,
+                            journal=Journal(args.journal_dir) if args.journal_dir else None,
+                            bulletin_board=BulletinBoard(args.board_dir))
+    live_results = LiveResults(commission, interval=args.results_interval).start()
+    server = CommissionServer(commission, ThreadPoolExecutor(max_workers=args.workers),
+                              max_connections=args.max_connections, max_in_flight=args.max_in_flight,
+                              live_results=live_results,
+                              archive=ArchiveWriter(args.archive, sync_interval=ARCHIVE_SYNC_INTERVAL)
+                              if args.archive else None)
+
+    print(f"Комісія слухає {args.host}:{args.port}", flush=True)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server.archive is not None:
+            server.archive.close()
+        if commission.journal is not None:
+            commission.journal.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+Шардована комісія: реєстр ділиться між процесами за хешем ІПН виборця.
+
+Кожен шард - окремий процес з власною частиною реєстру, власним лічильником
+і власною множиною зарахованих ID, але зі спільними ключами зв'язку та підпису.
+Реєстрація направляється в шард виборця. Голос спершу розшифровується і
+перевіряється будь-яким шардом (по колу), а потім зараховується шардом,
+якому належить ID бюлетеня, тому повторний ID ловиться незалежно від того,
+який шард відкрив конверт. Підсумки шардів сумуються в get_results().
+"""
+
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from Crypto.PublicKey import RSA
+from cryptography.hazmat.primitives import serialization
+
+from blind_signature import DEFAULT_SIGN_KEY_SIZE
+from commission import Commission, DEFAULT_BALLOT_BOXES, DEFAULT_AUDIT_RATE
+from crypto_tools import ballot_id_to_bytes
+from encryption_decryption import generate_rsa_keys
+from vote_tally import VoteTally
+from voter_registry import VoterRegistry, voter_id_to_digest
+
+# Комісія шарда в процесі-робітнику
+_shard = None
+
+
+def _init_shard(digests, candidates_names, comm_key_der, sign_key_der, ballot_boxes, audit_rate):
+    global _shard
+    keys = (serialization.load_der_private_key(comm_key_der, password=None), RSA.import_key(sign_key_der))
+    _shard = Commission(VoterRegistry.from_digests(digests), candidates_names, keys=keys,
+                        ballot_boxes=ballot_boxes, audit_rate=audit_rate)
+
+
+def _shard_register(ballot_kit, blind_ballots):
+    return _shard.register_ballot(ballot_kit, blind_ballots)
+
+
+def _shard_open_vote(encrypted_ballot, encrypted_signature, aes_key):
+    return _shard.open_vote(encrypted_ballot, encrypted_signature, aes_key)
+
+
+def _shard_open_votes_batch(envelopes):
+    return _shard.open_votes_batch(envelopes, workers=1)
+
+
+def _shard_record_vote(ballot):
+    _shard.record_vote(ballot)
+
+
+def _shard_record_votes(ballots):
+    return _shard.record_votes(ballots)
+
+
+def _shard_results():
+    return _shard.tally.counts.copy(), _shard.received_ballots
+
+
+def _shard_snapshot():
+    return _shard.tally_snapshot()
+
+
+def _route(key: bytes, num_shards: int) -> int:
+    """Номер шарда за байтовим ключем"""
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little') % num_shards
+
+
+class ShardedCommission:
+    def __init__(self, voters_tax_numbers, candidates_names: list[str], num_shards: int, keys=None,
+                 ballot_boxes=DEFAULT_BALLOT_BOXES, audit_rate=DEFAULT_AUDIT_RATE):
+        """
+        :param voters_tax_numbers: Хеші ІПН виборців або готовий VoterRegistry.
+        :param candidates_names: Список кандидатів.
+        :param num_shards: Кількість процесів-шардів.
+        :param keys: Ключі (приватний ключ зв'язку, ключ підпису), див. key_store. Якщо не передано - генеруються.
+        :param ballot_boxes: Скільки скриньок у наборі виборця, див. Commission.
+        :param audit_rate: Частка скриньок, які відкриваються при реєстрації, див. Commission.
+        """
+        if num_shards < 1:
+            raise ValueError("Потрібен хоча б один шард")
+
+        if keys is None:
+            keys = (generate_rsa_keys()[0], RSA.generate(DEFAULT_SIGN_KEY_SIZE))
+        private_comm_key, sign_key = keys
+        self.public_comm_key = private_comm_key.public_key()
+        self.public_sign_key = sign_key.publickey()
+        self.candidates_names = list(candidates_names)
+        self.num_shards = num_shards
+
+        if isinstance(voters_tax_numbers, VoterRegistry):
+            digests = np.asarray(voters_tax_numbers.digests)
+        else:
+            joined = b''.join(voter_id_to_digest(voter_id) for voter_id in voters_tax_numbers)
+            digests = np.frombuffer(joined, dtype=np.uint8).reshape(-1, 20)
+        self.num_voters = len(digests)
+
+        # Розподіл реєстру за хешем ІПН
+        shard_of_voter = np.array([_route(digest.tobytes(), num_shards) for digest in digests], dtype=np.int64)
+
+        comm_key_der = private_comm_key.private_bytes(
+            serialization.Encoding.DER,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        )
+        sign_key_der = sign_key.export_key(format='DER')
+        self._shards = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                initializer=_init_shard,
+                initargs=(np.ascontiguousarray(digests[shard_of_voter == shard]), self.candidates_names,
+                          comm_key_der, sign_key_der, ballot_boxes, audit_rate)
+            )
+            for shard in range(num_shards)
+        ]
+        # Шард для розшифрування голосів обирається по колу
+        self._next_opener = itertools.cycle(range(num_shards))
+
+    def shard_of_voter(self, voter_id) -> int:
+        return _route(voter_id_to_digest(voter_id), self.num_shards)
+
+    def shard_of_ballot(self, ballot: str) -> int:
+        return _route(ballot_id_to_bytes(ballot.split('|')[0]), self.num_shards)
+
+    def register_ballot(self, voter_id, ballot_kit: list[tuple[bytes, bytes]],
+                        blind_ballots: list[tuple[bytes, bytes]]) -> list[bytes]:
+        """
+        Реєстрація в шарді виборця. ID виборця потрібен лише для маршрутизації:
+        шард сам перевіряє, що бюлетені в наборі належать виборцю з його частини реєстру.
+        """
+        shard = self._shards[self.shard_of_voter(voter_id)]
+        return shard.submit(_shard_register, ballot_kit, blind_ballots).result()
+
+    def count_vote(self, encrypted_ballot: bytes, encrypted_signature: bytes, aes_key: bytes):
+        """Розшифрування і перевірка будь-яким шардом, зарахування - шардом ID бюлетеня"""
+        opener = self._shards[next(self._next_opener)]
+        ballot = opener.submit(_shard_open_vote, encrypted_ballot, encrypted_signature, aes_key).result()
+        self._shards[self.shard_of_ballot(ballot)].submit(_shard_record_vote, ballot).result()
+
+    def count_votes_batch(self, envelopes: list[tuple[bytes, bytes, bytes]]) -> list[tuple[bool, str | None]]:
+        """Пакетний підрахунок, результат для кожного конверту як у Commission.count_votes_batch"""
+        # Розшифрування рівними частинами на всіх шардах
+        chunks = [envelopes[shard::self.num_shards] for shard in range(self.num_shards)]
+        futures = [self._shards[shard].submit(_shard_open_votes_batch, chunk) for shard, chunk in enumerate(chunks)]
+        opened = [None] * len(envelopes)
+        for shard, future in enumerate(futures):
+            opened[shard::self.num_shards] = future.result()
+
+        results = [(False, error) for _, error in opened]
+
+        # Зарахування в шардах-власниках ID бюлетенів
+        by_owner = [[] for _ in range(self.num_shards)]
+        for i, (ballot, _) in enumerate(opened):
+            if ballot is None:
+                continue
+            try:
+                by_owner[self.shard_of_ballot(ballot)].append((i, ballot))
+            except ValueError as e:
+                results[i] = (False, str(e))
+
+        futures = [
+            (items, self._shards[shard].submit(_shard_record_votes, [ballot for _, ballot in items]))
+            for shard, items in enumerate(by_owner) if items
+        ]
+        for items, future in futures:
+            for (i, _), result in zip(items, future.result()):
+                results[i] = result
+
+        return results
+
+    def tally_snapshot(self) -> dict:
+        """Сума знімків шардів, див. Commission.tally_snapshot"""
+        futures = [shard.submit(_shard_snapshot) for shard in self._shards]
+        tally = VoteTally(self.candidates_names)
+        counted = registered = 0
+        for state in (future.result() for future in futures):
+            tally.counts += state['counts']
+            counted += state['counted']
+            registered += state['registered']
+        return {
+            'names': self.candidates_names,
+            'counts': tally.counts,
+            'counted': counted,
+            'registered': registered,
+            'register_size': self.num_voters,
+        }
+
+    def get_results(self):
+        """Підсумки всіх шардів у форматі Commission.get_results"""
+        tally = VoteTally(self.candidates_names)
+        received_ballots = set()
+        futures = [shard.submit(_shard_results) for shard in self._shards]
+        for counts, shard_ballots in (future.result() for future in futures):
+            tally.counts += counts
+            received_ballots |= shard_ballots
+        return tally.to_frame(), len(received_ballots), received_ballots
+
+    def close(self):
+        for shard in self._shards:
+            shard.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,38 @@
+"""
+Лічильник голосів на цілочисельному масиві. Таблиця pandas будується лише
+для видачі результатів, гарячий шлях підрахунку її не торкається.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class VoteTally:
+    def __init__(self, candidates_names: list[str]):
+        self.candidates_names = list(candidates_names)
+        self.counts = np.zeros(len(self.candidates_names), dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.candidates_names)
+
+    def add(self, candidate_number: int):
+        """Зараховує один голос за кандидата з номером від 1"""
+        if not 1 <= candidate_number <= len(self.candidates_names):
+            raise ValueError(f"Кандидата під номером {candidate_number} не існує")
+        self.counts[candidate_number - 1] += 1
+
+    def add_many(self, candidate_numbers):
+        """Зараховує пакет голосів одним np.bincount"""
+        numbers = np.asarray(candidate_numbers, dtype=np.int64)
+        if numbers.size == 0:
+            return
+        if numbers.min() < 1 or numbers.max() > len(self.candidates_names):
+            raise ValueError("У пакеті є номер неіснуючого кандидата")
+        self.counts += np.bincount(numbers - 1, minlength=len(self.candidates_names))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Таблиця результатів у форматі, який очікує main"""
+        return pd.DataFrame({
+            'Name': self.candidates_names,
+            'Votes_Count': self.counts.copy()
+        })
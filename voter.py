@@ -1,70 +1,145 @@
 """
 Клас Voter моделює виборця у системі голосування. Виборець може генерувати бюлетені,
 засліплювати їх для підпису комісією, а також вибирати та шифрувати бюлетень для відправки.
+
+Бюлетені і фактори засліплення створюються ліниво, при першому
+зверненні, а набір скриньок можна отримати потоком через iter_ballot_kit().
+Після cast_vote() усі секрети виборця відпускаються, лишається тільки ID
+обраного бюлетеня для перевірки на дошці оголошень.
 """
 
 from encryption_decryption import *
 from blind_signature import BlindSignature
 from crypto_tools import *
-import hashlib
 
 
 class Voter:
-    def __init__(self, hashed_tax_number, candidates_list):
-        # Генеруємо ключі RSA
-        self.private_key_object, self.public_key_object = generate_rsa_keys()
+    # Без __dict__: кіоск тримає чергу виборців, і кожен має займати якомога менше пам'яті
+    __slots__ = ('hidden_tax_number', 'candidates', 'bs', 'ballot_boxes', 'ballot_id',
+                 '_ballot_kit', '_blind_ballots', '_unblinding_factors', '_ballot_texts')
+
+    def __init__(self, hashed_tax_number, candidates_list, public_sign_key, blinding_pool=None, ballot_boxes=4):
+        """
+        :param hashed_tax_number: Хеш ІПН виборця.
+        :param candidates_list: Список кандидатів.
+        :param public_sign_key: Публічний ключ підпису комісії.
+        :param blinding_pool: Пул факторів засліплення для ключа комісії (create_blinding_pool).
+        :param ballot_boxes: Скільки скриньок готувати для перевірки, має збігатися з налаштуванням комісії.
+        """
         # Ховаємо ІПН за хешем
         self.hidden_tax_number = hashed_tax_number
-        # Створюємо об'єкт класу з імлпементацією сліпого підпису
-        self.bs = BlindSignature()
-        # Створюємо
+        # Засліплюємо бюлетені публічним ключем комісії, приватний ключ лишається у комісії
+        self.bs = BlindSignature(key=public_sign_key, blinding_pool=blinding_pool)
         self.candidates = candidates_list
-        # Створення декількох наборів бюлетенів для перевірки комісією
-        self.ballot_kit = self.generate_all_unsafe_ballots()
-        # Створення сліпих бюлетенів
-        self.blind_ballots, self.generated_r, self.ballot_texts = self.generate_safe_ballots()
+        self.ballot_boxes = ballot_boxes
+        # ID обраного бюлетеня, з'являється після голосування
+        self.ballot_id = None
+
+        # Бюлетені створюються при першому зверненні
+        self._ballot_kit = None
+        self._blind_ballots = None
+        self._unblinding_factors = None
+        self._ballot_texts = None
+
+    def _check_not_voted(self):
+        if self.ballot_id is not None:
+            raise ValueError("Виборець уже проголосував, його бюлетені знищено")
+
+    # ----------------------- Бюлетені для перевірки -----------------------
+
+    @property
+    def ballot_kit(self):
+        """Набір скриньок для перевірки комісією (створюється один раз і зберігається)"""
+        self._check_not_voted()
+        if self._ballot_kit is None:
+            self._ballot_kit = self.generate_all_unsafe_ballots(self.ballot_boxes)
+        return self._ballot_kit
+
+    def iter_ballot_kit(self, num_of_ballots=None):
+        """
+        Потоком повертає скриньки для перевірки, нічого не зберігаючи. Кожен
+        виклик створює новий набір, тому його треба відправити комісії один раз.
+
+        :param num_of_ballots: Кількість скриньок (за замовчуванням ballot_boxes).
+        """
+        self._check_not_voted()
+        for _ in range(self.ballot_boxes if num_of_ballots is None else num_of_ballots):
+            yield [generate_ballot_text(q + 1, self.hidden_tax_number, self.candidates)
+                   for q in range(len(self.candidates))]
 
     def generate_all_unsafe_ballots(self, num_of_ballots=4):
         """Генерує всі не сліпі бюлетені для перевірки комісією"""
-        all_unsafe_ballots = []
+        return list(self.iter_ballot_kit(num_of_ballots))
 
-        for i in range(num_of_ballots):
-            ballot_box = []
+    # ----------------------- Сліпі бюлетені -----------------------
 
-            for q in range(len(self.candidates)):
-                ballot = generate_ballot_text(q + 1, self.hidden_tax_number, self.candidates)
-                ballot_box.append(ballot)
+    def _get_safe_ballots(self):
+        self._check_not_voted()
+        if self._blind_ballots is None:
+            self._blind_ballots, self._unblinding_factors, self._ballot_texts = self.generate_safe_ballots()
+        return self._blind_ballots, self._unblinding_factors, self._ballot_texts
 
-            all_unsafe_ballots.append(ballot_box)
+    @property
+    def blind_ballots(self):
+        return self._get_safe_ballots()[0]
 
-        return all_unsafe_ballots
+    @property
+    def unblinding_factors(self):
+        return self._get_safe_ballots()[1]
 
+    @property
+    def ballot_texts(self):
+        return self._get_safe_ballots()[2]
 
-    def generate_safe_ballots(self):
+    def iter_safe_ballots(self):
         """
-        Генерація засліплених бюлетенів із текстами бюлетенів і засліплювальними множниками.
+        Потоком генерує (засліплений бюлетень, обернений засліплювальний множник, текст бюлетеня)
+        для кожного кандидата.
         """
-        blind_ballots = []  # Засліплені хеші
-        unblinding_factors = []  # Засліплювальні множники r
-        ballots_texts = []  # Тексти всіх бюлетенів
-
         for i in range(len(self.candidates)):
-            # Унікальний ID бюлетеня
-            timestamp = datetime.now().isoformat().encode('utf-8')
-            ballot_id = hashlib.sha1(timestamp).hexdigest()
-            ballot_id = ballot_id[:10]  # Беремо перші 10 символів
-
-            # Формуємо текст бюлетеня
-            ballot_text = f"{ballot_id}|None|{i+1}"
-            ballots_texts.append(ballot_text)
+            # Унікальний ID бюлетеня і текст бюлетеня
+            ballot_text = f"{new_ballot_id()}|None|{i+1}"
 
             # Засліплюємо бюлетень
-            blinded_ballot, r = self.bs.blind_message(ballot_text)
+            blinded_ballot, r_inv = self.bs.blind_message(ballot_text)
+            yield blinded_ballot, r_inv, ballot_text
 
-            # Додаємо засліплений бюлетень і засліплювальний множник
+    def generate_safe_ballots(self):
+        """
+        Генерація засліплених бюлетенів із текстами бюлетенів і оберненими засліплювальними множниками.
+        """
+        blind_ballots = []  # Засліплені хеші
+        unblinding_factors = []  # Обернені засліплювальні множники r^-1
+        ballots_texts = []  # Тексти всіх бюлетенів
+
+        for blinded_ballot, r_inv, ballot_text in self.iter_safe_ballots():
             blind_ballots.append(blinded_ballot)
-            unblinding_factors.append(r)
+            unblinding_factors.append(r_inv)
+            ballots_texts.append(ballot_text)
 
         return blind_ballots, unblinding_factors, ballots_texts
 
+    # ----------------------- Голосування -----------------------
 
+    def cast_vote(self, blind_signatures, voters_choice):
+        """
+        Розсліплює підпис обраного бюлетеня і знищує секрети виборця.
+
+        :param blind_signatures: Сліпі підписи комісії в порядку кандидатів.
+        :param voters_choice: Номер кандидата, починаючи з 1.
+        :return: (текст бюлетеня, підпис).
+        """
+        _, unblinding_factors, ballot_texts = self._get_safe_ballots()
+        ballot_text = ballot_texts[voters_choice - 1]
+        signature = self.bs.unblind_signature(blind_signatures[voters_choice - 1],
+                                              unblinding_factors[voters_choice - 1])
+        self.forget()
+        self.ballot_id = ballot_text.split('|')[0]
+        return ballot_text, signature
+
+    def forget(self):
+        """Відпускає бюлетені і фактори засліплення виборця"""
+        self._ballot_kit = None
+        self._blind_ballots = None
+        self._unblinding_factors = None
+        self._ballot_texts = None
@@ -0,0 +1,160 @@
+"""
+Компактний реєстр виборців: масив 20-байтних SHA-1 дайджестів, хеш-таблиця
+з лінійним пробуванням для пошуку за O(1) та бітова маска зареєстрованих виборців.
+"""
+
+import hashlib
+import numpy as np
+
+DIGEST_SIZE = 20
+# Максимальне заповнення хеш-таблиці
+MAX_LOAD_FACTOR = 0.7
+
+
+def voter_id_to_digest(voter_id) -> bytes:
+    """
+    Переводить ID виборця в 20-байтний дайджест. Рядок з 40 шістнадцяткових
+    символів вважається вже готовим SHA-1 хешем, все інше хешується.
+    """
+    if isinstance(voter_id, (bytes, bytearray)) and len(voter_id) == DIGEST_SIZE:
+        return bytes(voter_id)
+
+    voter_id = str(voter_id)
+    if len(voter_id) == 2 * DIGEST_SIZE:
+        try:
+            return bytes.fromhex(voter_id)
+        except ValueError:
+            pass
+
+    return hashlib.sha1(voter_id.encode('utf-8')).digest()
+
+
+class VoterRegistry:
+    def __init__(self, voter_ids):
+        """
+        :param voter_ids: ID виборців (хеші ІПН у шістнадцятковому вигляді).
+        """
+        joined = b''.join(voter_id_to_digest(voter_id) for voter_id in voter_ids)
+        self._build(np.frombuffer(joined, dtype=np.uint8).reshape(-1, DIGEST_SIZE))
+
+    @classmethod
+    def from_digests(cls, digests: np.ndarray, hash_table: np.ndarray | None = None):
+        """
+        Створює реєстр з готового масиву дайджестів форми (N, 20) без копіювання
+        (масив може бути відображеним у пам'ять файлом).
+
+        :param hash_table: Збережена раніше хеш-таблиця (VoterRegistry.hash_table) для тих
+                           самих дайджестів, тоді таблиця не будується заново.
+        """
+        if digests.ndim != 2 or digests.shape[1] != DIGEST_SIZE or digests.dtype != np.uint8:
+            raise ValueError("Очікується масив uint8 форми (N, 20)")
+        registry = cls.__new__(cls)
+        registry._build(digests, hash_table)
+        return registry
+
+    def _build(self, digests, hash_table=None):
+        self._digests = digests
+        self._checksum = None
+        n = len(digests)
+        self._registered = np.zeros((n + 7) // 8, dtype=np.uint8)
+        self.registered_count = 0
+
+        if hash_table is not None:
+            table_size = len(hash_table)
+            if table_size & (table_size - 1) or table_size * MAX_LOAD_FACTOR < n:
+                raise ValueError("Хеш-таблиця не відповідає розміру реєстру")
+            self._table = hash_table
+            self._mask = table_size - 1
+            return
+
+        # Перші 8 байтів дайджесту як ключ хеш-таблиці, SHA-1 вже рівномірно розподілений
+        keys = np.ascontiguousarray(digests[:, :8]).view('<u8').ravel()
+
+        table_size = 8
+        while table_size * MAX_LOAD_FACTOR < n:
+            table_size *= 2
+        self._mask = table_size - 1
+        index_dtype = np.int32 if n < 2 ** 31 else np.int64
+        self._table = np.full(table_size, -1, dtype=index_dtype)
+
+        # Векторизована вставка з лінійним пробуванням: за раунд кожен вільний слот
+        # отримує першого претендента, решта переходять до наступного слоту
+        slots = (keys & np.uint64(self._mask)).astype(np.int64)
+        del keys
+        pending = np.arange(n, dtype=np.int64)
+        while pending.size:
+            current = slots[pending]
+            free = self._table[current] == -1
+            free_slots, first = np.unique(current[free], return_index=True)
+            self._table[free_slots] = pending[free][first]
+
+            placed = self._table[current] == pending
+            pending = pending[~placed]
+            slots[pending] = (slots[pending] + 1) & self._mask
+
+    def index_of(self, voter_id) -> int:
+        """Позиція виборця в реєстрі або -1, якщо такого виборця немає"""
+        digest = voter_id_to_digest(voter_id)
+        key = int.from_bytes(digest[:8], 'little')
+        slot = key & self._mask
+
+        while True:
+            index = int(self._table[slot])
+            if index < 0:
+                return -1
+            if self._digests[index].tobytes() == digest:
+                return index
+            slot = (slot + 1) & self._mask
+
+    def __contains__(self, voter_id) -> bool:
+        return self.index_of(voter_id) >= 0
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def voter_id(self, index: int) -> str:
+        """ID виборця за позицією в реєстрі"""
+        return self._digests[index].tobytes().hex()
+
+    def is_registered(self, index: int) -> bool:
+        """Чи отримав виборець підписи бюлетенів"""
+        return bool((self._registered[index >> 3] >> (index & 7)) & 1)
+
+    def mark_registered(self, index: int):
+        """Позначає виборця як зареєстрованого"""
+        if not self.is_registered(index):
+            self._registered[index >> 3] |= np.uint8(1 << (index & 7))
+            self.registered_count += 1
+
+    def registration_bits(self) -> bytes:
+        """Бітова маска зареєстрованих виборців для знімка стану"""
+        return self._registered.tobytes()
+
+    def restore_registration_bits(self, data: bytes):
+        """Відновлює бітову маску зі знімка стану"""
+        registered = np.frombuffer(data, dtype=np.uint8)
+        if registered.shape != self._registered.shape:
+            raise ValueError("Знімок не відповідає розміру реєстру")
+        self._registered = registered.copy()
+        self.registered_count = int(np.unpackbits(self._registered).sum())
+
+    @property
+    def digests(self) -> np.ndarray:
+        """Масив дайджестів форми (N, 20)"""
+        return self._digests
+
+    def checksum(self) -> bytes:
+        """SHA-256 дайджестів у порядку реєстру: стан комісії зберігається за позиціями, тому прив'язується до нього"""
+        if self._checksum is None:
+            self._checksum = hashlib.sha256(np.ascontiguousarray(self._digests).data).digest()
+        return self._checksum
+
+    @property
+    def hash_table(self) -> np.ndarray:
+        """Хеш-таблиця позицій, яку можна зберегти разом з дайджестами"""
+        return self._table
+
+    @property
+    def nbytes(self) -> int:
+        """Пам'ять, яку займає реєстр"""
+        return self._digests.nbytes + self._table.nbytes + self._registered.nbytes